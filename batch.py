@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 17:40
+
+@author: a002028
+
+Headless batch reprocessing of BAWS products (no QGIS needed).
+
+For every date, the level 2 scenes (*<YYYYMMDD>*.tiff) are merged into the
+daymap (shp + tiff) together with its SeaTrackWeb and text files. Dates run
+in parallel in worker processes. Weekmaps are created in chunks of
+consecutive dates (one rolling CompositeStore per chunk) as soon as the
+daymaps of the chunk and the six days before are done. Daymaps from before
+the date range are used if they are found in the output folder.
+
+Output is written per year: <output_directory>/<YYYY>/cyano_daymap_<date>.shp
+
+Run from the folder above the plugin folder:
+    python -m BAWS.batch 20200601 20200831 -i /level_2 -o /reprocessed
+"""
+import os
+import argparse
+from shutil import copyfile
+from concurrent.futures import wait
+
+import pandas as pd
+
+from . import handlers
+from . import subprocesses
+from . import utils
+from . import writers
+from .handlers.composite import write_weekmap
+
+
+DAYS_IN_COMPOSITE = 7
+
+
+class BatchJob:
+    """Settings of a batch run, sent to the worker processes."""
+
+    def __init__(self, level_2_directory, output_directory,
+                 grid_resolution=1000, tiled=None, user='BAWS',
+                 create_stw_files=True, create_text_files=True,
+                 settings_directory=None):
+        """Initialize.
+
+        Args:
+            level_2_directory: Folder with level 2 scenes (class 0-4 tiffs).
+            output_directory: Folder to write the products in.
+            grid_resolution: Production grid, 1000 or 300 (m).
+            tiled: Merge scenes block window by block window. Defaults to
+                   True for the 300 m grid.
+            user: Name used in the text files.
+            create_stw_files: If True, write SeaTrackWeb files.
+            create_text_files: If True, write auto generated text files.
+            settings_directory: Folder with templates, districts etc.
+                                (default: the plugin etc folder).
+        """
+        self.level_2_directory = level_2_directory
+        self.output_directory = output_directory
+        self.grid_resolution = grid_resolution
+        self.tiled = grid_resolution < 1000 if tiled is None else tiled
+        self.user = user
+        self.create_stw_files = create_stw_files
+        self.create_text_files = create_text_files
+        self.settings_directory = settings_directory or os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), 'etc')
+        self.raster_template_path = os.path.join(
+            self.settings_directory, 'raster_template.tiff')
+        self.district_path = os.path.join(
+            self.settings_directory, 'baws_districts.tiff')
+        self.baws_10000_paths = [
+            os.path.join(self.settings_directory, 'longitude_baws10000.npy'),
+            os.path.join(self.settings_directory, 'latitude_baws10000.npy')
+        ]
+        self.text_mapper = handlers.JSONHandler.read(
+            file_path=os.path.join(self.settings_directory,
+                                   'auto_texting.json'))
+
+    @property
+    def grid(self):
+        """Return the production grid."""
+        return handlers.get_grid(self.grid_resolution)
+
+    def get_raster_handler(self):
+        """Return RasterHandler on the production grid."""
+        return handlers.RasterHandler(self.raster_template_path,
+                                      grid=self.grid)
+
+    def output_path(self, prefix, date, suffix='.shp'):
+        """Return path of product, eg. output_path('cyano_daymap_', date)."""
+        folder = os.path.join(self.output_directory, date[:4])
+        if not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, ''.join([prefix, date, suffix]))
+
+    def find_scenes(self, date):
+        """Return sorted list of level 2 scenes of date."""
+        return sorted(utils.generate_filepaths(
+            self.level_2_directory, pattern=date, endswith='.tiff'))
+
+
+def composite_dates(date):
+    """Return list of dates in the weekly composite ending with date."""
+    dr = pd.date_range(pd.Timestamp(date) - pd.Timedelta('6 days'),
+                       periods=DAYS_IN_COMPOSITE)
+    return [ts.strftime('%Y%m%d') for ts in dr]
+
+
+def write_texts(job, date, daymap_path, week=False):
+    """Write auto generated text files of date (see TextFileHandler).
+
+    Args:
+        job: BatchJob.
+        date: Date string (YYYYMMDD).
+        daymap_path: Path to the daymap raster.
+        week: If True the weekmap texts are written, otherwise the daymap
+              texts (and the drift texts, which are copied as is).
+    """
+    pattern = 'BASE_TEXT'
+    dates = composite_dates(date)
+    texting_kwargs = dict(
+        user=job.user,
+        text_mapper=job.text_mapper,
+        daymap_path=daymap_path,
+        weekmap_path=daymap_path.replace('_daymap_', '_weekmap_'),
+        start_date=dates[0],
+        end_date=dates[-1],
+        grid=job.grid
+    )
+    text_objects = {}
+    for fid in utils.generate_filepaths(job.settings_directory,
+                                        pattern=pattern,
+                                        only_from_dir=False):
+        file_name = os.path.basename(fid).replace(pattern, date)
+        dst_path = os.path.join(os.path.dirname(daymap_path), file_name)
+        is_week = 'daymap' not in file_name
+        if is_week != week:
+            continue
+        if 'drift_' in file_name:
+            copyfile(fid, dst_path)
+            continue
+        auto_txt_class = handlers.WeekTexting if is_week \
+            else handlers.DayTexting
+        if auto_txt_class not in text_objects:
+            text_objects[auto_txt_class] = auto_txt_class(
+                job.district_path, **texting_kwargs)
+        text_str = text_objects[auto_txt_class].get_text(
+            lang='swe' if '_swe' in file_name else 'eng')
+        writers.text_writer(
+            'pandas', dst_path,
+            df=pd.DataFrame({0: [text_str]}),
+            sep='\t',
+            index=None,
+            header=None,
+            encoding='utf-8'
+        )
+
+
+def process_day(job, date):
+    """Create the daymap (shp + tiff), SeaTrackWeb and text files of date.
+
+    Returns:
+        Path to the daymap raster, or None if there are no scenes.
+    """
+    scenes = job.find_scenes(date)
+    if not scenes:
+        return None
+    raster_handler = job.get_raster_handler()
+    daymap_path = job.output_path('cyano_daymap_', date)
+    raster_handler.merge_scene_rasters(
+        layer_paths=scenes,
+        output_filename=daymap_path,
+        tiled=job.tiled
+    )
+    raster_handler.rasterize(daymap_path)
+    if job.create_stw_files:
+        subprocesses.create_stw(daymap_path, date, *job.baws_10000_paths)
+    daymap_tiff = daymap_path.replace('.shp', '.tiff')
+    if job.create_text_files:
+        write_texts(job, date, daymap_tiff)
+    return daymap_tiff
+
+
+def process_weeks(job, dates):
+    """Create the weekmaps (shp + tiff) and text files of consecutive dates.
+
+    One CompositeStore rolls through the dates, so every daymap is only
+    read once per chunk.
+
+    Returns:
+        List of weekmap raster paths.
+    """
+    raster_handler = job.get_raster_handler()
+    composite_store = handlers.CompositeStore()
+    weekmaps = []
+    for date in dates:
+        daymap_tiff = job.output_path('cyano_daymap_', date, suffix='.tiff')
+        if not os.path.isfile(daymap_tiff):
+            # Production creates weekmaps only for days with a daymap.
+            continue
+        files = [job.output_path('cyano_daymap_', d, suffix='.tiff')
+                 for d in composite_dates(date)]
+        files = [fid for fid in files if os.path.isfile(fid)]
+        week_bloom = composite_store.update(files).copy()
+        weekmap_path = write_weekmap(
+            week_bloom, composite_store.meta,
+            daymap_tiff.replace('_daymap_', '_weekmap_')
+        )
+        raster_handler.shapeify(week_bloom, weekmap_path)
+        if job.create_text_files:
+            write_texts(job, date, daymap_tiff, week=True)
+        weekmaps.append(weekmap_path)
+    return weekmaps
+
+
+def chunks(dates, size):
+    """Yield lists of consecutive dates."""
+    for i in range(0, len(dates), size):
+        yield dates[i:i + size]
+
+
+def run_batch(job, start_date, end_date, max_workers=None,
+              chunk_size=14):
+    """Reprocess all dates between start_date and end_date.
+
+    A failed daymap does not stop the run. Weekmaps that depend on it are
+    skipped and all failures are reported at the end.
+
+    Args:
+        job: BatchJob.
+        start_date: First date (YYYYMMDD).
+        end_date: Last date (YYYYMMDD).
+        max_workers: Number of worker processes
+                     (default: number of cores - 1).
+        chunk_size: Number of consecutive weekmaps per worker job.
+
+    Returns:
+        Dictionary {'daymaps': {date: path}, 'weekmaps': [paths],
+                    'failed': {date: error message}}
+    """
+    dates = [ts.strftime('%Y%m%d')
+             for ts in pd.date_range(start_date, end_date)]
+    pool = subprocesses.get_process_pool(name='batch',
+                                         max_workers=max_workers)
+    day_futures = {date: pool.submit(process_day, job, date)
+                   for date in dates}
+
+    failed = {}
+    week_futures = {}
+    for chunk in chunks(dates, chunk_size):
+        needed = {d for date in chunk for d in composite_dates(date)
+                  if d in day_futures}
+        wait([day_futures[d] for d in needed])
+        failed_days = {d for d in needed if day_futures[d].exception()}
+        for d in failed_days:
+            failed[d] = 'daymap: %s' % day_futures[d].exception()
+        chunk = [date for date in chunk
+                 if not failed_days.intersection(composite_dates(date))]
+        if chunk:
+            week_futures[chunk[0]] = pool.submit(process_weeks, job, chunk)
+
+    weekmaps = []
+    for date, future in week_futures.items():
+        if future.exception():
+            failed[date] = 'weekmaps: %s' % future.exception()
+        else:
+            weekmaps.extend(future.result())
+
+    daymaps = {date: future.result() for date, future in day_futures.items()
+               if not future.exception() and future.result()}
+    print('Batch %s - %s completed: %i daymaps, %i weekmaps, %i failed'
+          % (start_date, end_date, len(daymaps), len(weekmaps), len(failed)))
+    for date, message in sorted(failed.items()):
+        print('  %s %s' % (date, message))
+    return {'daymaps': daymaps, 'weekmaps': weekmaps, 'failed': failed}
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(
+        description='Reprocess BAWS products for a date range without QGIS.')
+    parser.add_argument('start_date', help='First date (YYYYMMDD)')
+    parser.add_argument('end_date', help='Last date (YYYYMMDD)')
+    parser.add_argument('-i', '--level-2', required=True,
+                        help='Folder with level 2 scenes')
+    parser.add_argument('-o', '--output', required=True,
+                        help='Output folder')
+    parser.add_argument('-r', '--resolution', type=int, default=1000,
+                        choices=(1000, 300), help='Grid resolution (m)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Number of worker processes')
+    parser.add_argument('--user', default='BAWS',
+                        help='Name used in the text files')
+    parser.add_argument('--no-stw', action='store_true',
+                        help='Do not write SeaTrackWeb files')
+    parser.add_argument('--no-text', action='store_true',
+                        help='Do not write text files')
+    parser.add_argument('--raster-cache', default=None,
+                        help='Folder for memory mapped copies of the rasters '
+                             '(default: no cache)')
+    parser.add_argument('--raster-memory', type=int, default=512,
+                        help='Memory budget (MB) per process of the raster '
+                             'read cache')
+    args = parser.parse_args(argv)
+
+    # Before the worker processes are started, they get the folder through
+    # the environment.
+    handlers.raster_cache.configure(args.raster_cache)
+    handlers.raster_cache.set_memory_budget(args.raster_memory * 1024 ** 2)
+
+    job = BatchJob(args.level_2, args.output,
+                   grid_resolution=args.resolution,
+                   user=args.user,
+                   create_stw_files=not args.no_stw,
+                   create_text_files=not args.no_text)
+    try:
+        result = run_batch(job, args.start_date, args.end_date,
+                           max_workers=args.workers)
+    finally:
+        subprocesses.shutdown_process_pools()
+    return 1 if result['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -38,9 +38,13 @@ import time
 
 from .baws_provider import BAWSProvider
 from .config import Settings
+from . import executor
+from . import subprocesses
+from . import tasks
 from . import utils
 
-from qgis.PyQt.QtCore import QCoreApplication, QDate, Qt
+from qgis.PyQt.QtCore import (QCoreApplication, QDate, QObject, Qt,
+                              pyqtSignal, pyqtSlot)
 from qgis.PyQt.QtGui import QIcon, QPixmap
 from qgis.PyQt.QtWidgets import (QAction,
                                  QFileDialog,
@@ -53,7 +57,8 @@ from qgis.PyQt.QtWidgets import (QAction,
                                  QPushButton)
 import qgis
 
-from qgis.core import (QgsVectorLayer,
+from qgis.core import (Qgis,
+                       QgsVectorLayer,
                        QgsField,
                        QgsProject,
                        QgsProcessingProvider,
@@ -79,6 +84,39 @@ from . import readers
 from . import handlers
 
 
+# Max number of seconds to wait for the PNG-maps.
+MAP_TIMEOUT = 300
+
+
+class MessageBar(QObject):
+    """Show messages from background threads in the QGIS message bar.
+
+    The object lives in the main thread. A signal emitted from another
+    thread is queued, so the message bar is only touched by the main thread.
+    """
+
+    message = pyqtSignal(str, str, int)
+
+    def __init__(self, iface):
+        """Initialize.
+
+        Args:
+            iface (QgisInterface): The QGIS interface instance.
+        """
+        super().__init__()
+        self.iface = iface
+        self.message.connect(self._push)
+
+    @pyqtSlot(str, str, int)
+    def _push(self, title, text, level):
+        """Show message (main thread)."""
+        self.iface.messageBar().pushMessage(title, text, level=level)
+
+    def push(self, text, level=Qgis.Info):
+        """Show text in the message bar (from any thread)."""
+        self.message.emit(f'BAWS ({__version__})', text, int(level))
+
+
 def arrange_layer_order(layers):
     """Set order of imported layers in QGIS.
 
@@ -110,6 +148,8 @@ class BAWSPlugin:
         self.settings.set_environment(self.qmb)
         self.settings.check_production_folders(self.qmb)
         self._date_check = self.settings.selected_date
+        self._statistics_saved = False
+        self.message_bar = MessageBar(self.iface)
 
         self.provider = BAWSProvider()
         self.provider.baws.initialize_layer_handler(self.iface,
@@ -117,12 +157,18 @@ class BAWSPlugin:
         # self.provider.baws.initialize_ferrybox_handler(self.settings)
 
         self.provider.baws.initialize_raster_handler(
-            self.settings.raster_template_file_path)
+            self.settings.raster_template_file_path,
+            grid=self.settings.grid
+        )
 
-        self.provider.baws.initialize_plot_handler(
-            path_basemap=self.settings.basemap_obj_path,
-            path_figure=self.settings.basemap_figure_path
+        # The map workers load the map figures in the background.
+        self.map_template = subprocesses.MapTemplate(
+            path_figure=str(self.settings.basemap_figure_path),
+            path_basemap=str(self.settings.basemap_obj_path),
+            cache_directory=str(self.settings.map_cache_folder),
+            render_mode=self.settings.map_render_mode
         )
+        subprocesses.start_map_workers(self.map_template)
 
         self.calendar = Calendar(self)
 
@@ -195,6 +241,13 @@ class BAWSPlugin:
     def unload(self):
         """Unload the plugin."""
         QgsApplication.processingRegistry().removeProvider(self.provider)
+        if self._statistics_saved:
+            # baws_statistics.json for downstream consumers, written once
+            # per session from the statistics store.
+            stat_handler = handlers.StatHandler(self.settings)
+            executor.submit('io', stat_handler.export_statistics)
+        executor.shutdown(wait=True)
+        subprocesses.shutdown_process_pools(wait=False)
 
     def add_action(self, icon_path, text=None, callback=None):
         """Add action button to QGIS interface.
@@ -335,9 +388,10 @@ class BAWSPlugin:
 
         self.provider.baws.rasterize_shapefiles(
             list(files_checked.values()),
-            save_path=self.settings.user_temporary_folder
+            save_path=self.settings.user_temporary_folder,
+            wait_for=self.settings.temporary_folder_ready
         )
-        print('rasterize_shapefiles in progress, as thread process!')
+        print('rasterize_shapefiles in progress, in worker processes!')
         if any(inform_data_manager):
             self.mbx('Satellite Level 2 data have been found in TEST '
                      'data-folder but are missing in PROD-data folder '
@@ -546,30 +600,6 @@ class BAWSPlugin:
                 weekmap_path=self.settings.cyano_weekmap_path
             )
 
-    def process_daily_map(self, handler, path):
-        """Process daily data.
-
-        Args:
-            handler: Data handler.
-            path: File path
-        """
-        handler.read(path)
-        # handler.calculate_area()
-        handler.change_csr()
-        self.provider.baws.daily_map(handler, file_path=path)
-
-    def process_weekly_map(self, handler, path):
-        """Process weekly data.
-
-        Args:
-            handler: Data handler.
-            path: File path
-        """
-        handler.read(path)
-        # handler.calculate_area()
-        handler.change_csr()
-        self.provider.baws.weekly_map(handler, file_path=path)
-
     def _create_maps_and_statistics(self, daymap_path=None, weekmap_path=None):
         """Plot the saved shapefiles to png files.
 
@@ -590,38 +620,66 @@ class BAWSPlugin:
         print('Drawing daily map from {}'.format(daymap_path))
         print('Drawing weekly map from {}'.format(weekmap_path))
 
-        dm_shape_handler = handlers.DailyShapeHandler()
-        wm_shape_handler = handlers.WeeklyShapeHandler()
-
         start_time = time.time()
-        # if daymap_path and weekmap_path:
-        #     # Daily data / stats
-        #     stat_handler = handlers.StatHandler(
-        #         self.settings,
-        #         objects=[dm_shape_handler, wm_shape_handler]
-        #     )
-        #     utils.thread_process(stat_handler.save_statistics)
-
-        if daymap_path:
-            self.process_daily_map(dm_shape_handler, daymap_path)
-        # dm_shape_handler.read(daymap_path)
-
-        # Weekly data / stats
-        if weekmap_path:
-            self.process_weekly_map(wm_shape_handler, weekmap_path)
-
-        self.provider.baws.initialize_plot_handler(
-            reset=True,
-            path_basemap=self.settings.basemap_obj_path,
-            path_figure=self.settings.basemap_figure_path
+        # The maps are rendered in the map workers, QGIS is not blocked.
+        # Submitted first, they do not depend on the statistics.
+        futures = subprocesses.render_maps(
+            self.map_template,
+            [('day', daymap_path), ('week', weekmap_path)]
         )
 
-        if self.settings.PROD_system:
-            utils.thread_process(
-                self.settings.test_handler.copy_prod_files_to_test_system)
+        if daymap_path and weekmap_path:
+            # Daily / weekly stats, from the rasters next to the shapefiles.
+            try:
+                handlers.StatHandler(
+                    self.settings,
+                    daymap_path=daymap_path,
+                    weekmap_path=weekmap_path
+                ).save_statistics()
+                self._statistics_saved = True
+            except Exception as e:
+                executor.log_message('Statistics failed: %s' % e, 'Critical')
+                self.message_bar.push('Statistics failed: %s' % e,
+                                      Qgis.Critical)
+
+        executor.submit('cpu', self._wait_for_maps, futures, start_time)
+
+    def _wait_for_maps(self, futures, start_time):
+        """Wait for the map workers (background thread) and report.
 
-        print("maps and statistics completed in --%.1f sec"
-              "" % (time.time() - start_time))
+        The result is shown in the QGIS message bar.
+
+        Args:
+            futures: Dictionary {name: Future} from subprocesses.render_maps.
+            start_time: Start time of _create_maps_and_statistics.
+        """
+        try:
+            results = tasks.wait_for(list(futures.values()),
+                                     timeout=MAP_TIMEOUT,
+                                     name='Map rendering')
+        except tasks.TaskError as e:
+            executor.log_message(str(e), 'Critical')
+            self.message_bar.push(str(e), Qgis.Critical)
+            return
+        for png_path, seconds in results:
+            executor.log_message('PNG-map saved: %s (%.1f sec)'
+                                 % (png_path, seconds))
+
+        if self.settings.PROD_system:
+            executor.submit(
+                'io', self.settings.test_handler.copy_prod_files_to_test_system)
+
+        executor.log_message("maps and statistics completed in --%.1f sec"
+                             "" % (time.time() - start_time))
+        info = handlers.raster_cache.cache_info()
+        executor.log_message('Raster cache: %i hits, %i misses, %.0f of '
+                             '%.0f MB in memory, %i memory maps'
+                             % (info.hits, info.misses,
+                                info.currsize / 1024 ** 2,
+                                info.maxsize / 1024 ** 2, info.nr_maps))
+        self.message_bar.push('PNG-maps saved (%s)' % ', '.join(
+            os.path.basename(png_path) for png_path, _ in results),
+            Qgis.Success)
         print('\nBAWS task completed!')
 
     @staticmethod
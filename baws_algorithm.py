@@ -28,7 +28,6 @@ __copyright__ = '(C) 2019 by SMHI'
 __revision__ = '$Format:%H$'
 
 import os
-from pathlib import Path
 import time
 from shutil import copyfile
 
@@ -48,10 +47,16 @@ from qgis.core import (
 
 from . import readers
 from . import handlers
+from . import executor
 from . import subprocesses
+from . import tasks
 from . import utils
 
 
+# Max number of seconds to wait for background tasks.
+TASK_TIMEOUT = 300
+
+
 class BAWSAlgorithm(QgsProcessingAlgorithm):
     """Based on example algorithm class."""
 
@@ -74,43 +79,44 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
         if not hasattr(self, 'ferrybox_handler'):
             self.ferrybox_handler = handlers.FerryBoxHandler(settings)
 
-    def initialize_raster_handler(self, rst_template_path):
+    def initialize_raster_handler(self, rst_template_path, grid=None):
         """Initialize the raster handler.
 
         Args:
             rst_template_path: path to raster meta template
+            grid: BAWSGrid to work on (1000 m or 300 m).
         """
         if not hasattr(self, 'raster_handler'):
-            self.raster_handler = handlers.RasterHandler(rst_template_path)
-
-    def initialize_plot_handler(self, reset=False, path_figure=None,
-                                path_basemap=None):
-        """Initialize the plot handler.
-
-        Args:
-            reset: True/False
-        """
-        if reset or not hasattr(self, 'plot_handler'):
-            self.plot_handler = handlers.MapHandler(path_basemap=path_basemap,
-                                                    path_figure=path_figure)
-            utils.thread_process(self.plot_handler.initialize_maps)
+            self.raster_handler = handlers.RasterHandler(rst_template_path,
+                                                         grid=grid)
 
-    def rasterize_shapefiles(self, args, save_path=None):
+    def rasterize_shapefiles(self, args, save_path=None, wait_for=None):
         """Create raster files from shapefiles.
 
+        The files are rasterized in a process pool, the merge step waits for
+        self.rasterize_futures (see wait_for_rasterized_files).
+
         Args:
             args: iterable of paths to shapefiles.
             save_path: path to save files.
+            wait_for: Future to wait for before rasterizing, eg. the reset
+                      of the temporary folder
+                      (Settings.temporary_folder_ready).
         """
-        for fid in args:
-            utils.thread_process(subprocesses.rasterize_file,
-                                 self.raster_handler.raster_meta,
-                                 save_path,
-                                 fid)
-        utils.thread_process(subprocesses.check_while_saving,
-                             save_path,
-                             '.tiff',
-                             len(args))
+        if wait_for is not None:
+            tasks.wait_for(wait_for, timeout=TASK_TIMEOUT,
+                           name='Reset of the temporary folder')
+        self.rasterize_futures = subprocesses.rasterize_files(
+            self.raster_handler.raster_meta, save_path, args
+        )
+
+    def wait_for_rasterized_files(self):
+        """Wait for rasterize_shapefiles to complete."""
+        futures = getattr(self, 'rasterize_futures', None)
+        if futures:
+            subprocesses.wait_for_rasterization(futures,
+                                                timeout=TASK_TIMEOUT)
+            self.rasterize_futures = None
 
     def merge_selected_shapefiles(self, settings, categorize=True):
         """Merge the selected shape layers.
@@ -123,6 +129,7 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
         print('Starting merging work. Usually takes ~5-30 seconds, '
               'depending on size and number of geometries..')
         start_time = time.time()
+        self.wait_for_rasterized_files()
         merge_file_path = os.path.join(settings.user_temporary_folder,
                                        'Cyano_merged.shp')
         self.raster_handler.merge_scene_shapes(
@@ -136,27 +143,40 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
         print("merge_selected_shapefiles completed in --%.2f sec"
               "\n" % (time.time() - start_time))
 
-    def merge_selected_rasterfiles(self, settings, categorize=True):
+    def merge_selected_rasterfiles(self, settings, categorize=True,
+                                   tiled=None):
         """Merge the selected raster layers.
 
         Args:
             settings: The BAWS settings object.
             categorize: If true the layer will be categorized using
                         the classes 1-4
+            tiled: If true the scenes are merged block window by block
+                   window (low memory usage). Defaults to
+                   settings.tiled_merge.
         """
-        print('Starting merging work. Usually takes ~5-30 seconds, '
-              'depending on size and number of geometries..')
+        if tiled is None:
+            tiled = settings.tiled_merge
+        print('Starting merging work%s. Usually takes ~5-30 seconds, '
+              'depending on size and number of geometries..'
+              % (' (tiled)' if tiled else ''))
         start_time = time.time()
         merge_file_path = os.path.join(settings.user_temporary_folder,
                                        'Cyano_merged.shp')
         self.raster_handler.merge_scene_rasters(
             layer_paths=self.layer_handler.active_cyano_tiff_layers_path,
             output_filename=merge_file_path,
+            tiled=tiled,
+            # Traced only where memory is the concern (high resolution grids).
+            measure_memory=tiled
         )
         self.import_merged_file(merge_file_path, categorize=categorize)
 
-        print("merge_selected_rasterfiles completed in "
-              "--%.2f sec\n" % (time.time() - start_time))
+        peak_memory = self.raster_handler.merge_peak_memory
+        memory_text = '' if peak_memory is None else (
+            ' (scene merge peak memory %.1f MB)' % (peak_memory / 10 ** 6))
+        print("merge_selected_rasterfiles completed in --%.2f sec%s\n"
+              % (time.time() - start_time, memory_text))
 
     def import_merged_file(self, merge_file_path, categorize=False,
                            filter_invalid_areas=False):
@@ -189,13 +209,18 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
         )
 
     def _copy_tif_files(self, settings):
-        """Copy file to path."""
+        """Copy file to path.
+
+        Returns:
+            List of futures, one per copied file.
+        """
         if not any(self.layer_handler.active_tif_layer_names):
-            return
+            return []
         files_to_copy = utils.generate_filepaths(
             settings.baws_USER_SELECTED_level_1_directory,
             pattern_list=self.layer_handler.active_tif_layer_names
         )
+        futures = []
         for fid in files_to_copy:
             file_name = fid.split('\\')[-1]
             print('Copying %s to tif_archive' % file_name)
@@ -203,9 +228,50 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
                 settings.baws_USER_SELECTED_tiff_archive_directory,
                 file_name
             )
-            utils.thread_process(copyfile, fid, dst_path)
+            futures.append(executor.submit('io', copyfile, fid, dst_path))
+
+        print('\nTif files are being copied in the background')
+        return futures
+
+    def _archive_daymap(self, settings, daymap_path):
+        """Add daymap raster to the bit-packed bloom archive of the season.
+
+        The archive is opened and written in the io queue.
+
+        Returns:
+            Future.
+        """
+        return executor.submit(
+            'io', self._add_to_archive,
+            os.path.join(settings.baws_USER_SELECTED_statistics_directory,
+                         'bloom_archive'),
+            settings.current_working_date,
+            settings.grid.shape,
+            daymap_path
+        )
+
+    @staticmethod
+    def _add_to_archive(directory, date, shape, daymap_path):
+        """Add daymap to the archive (background task).
+
+        Errors are logged here and not raised. A failed archive update
+        should not stop the next drain of the io queue (rasterization).
 
-        print('\nTif files are being copied in background threads')
+        Returns:
+            True if the daymap was added, False if not (outside of the
+            archive season, or failed).
+        """
+        try:
+            archive = handlers.BloomArchive(directory, date[:4], shape=shape)
+            if not archive.in_season(date):
+                return False
+            archive.add_file(daymap_path)
+        except Exception as e:
+            executor.log_message('%s was not added to the bloom archive: %s'
+                                 % (os.path.basename(daymap_path), e),
+                                 'Warning')
+            return False
+        return True
 
     def save_files(self, settings, gui_mxb, layer_name='Cyano_merged',
                    daily_outpath=None, copy_tif_files=True,
@@ -225,7 +291,7 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
             create_stw_files:
             create_weekly_map:
         """
-        # Daily tif files
+        # Daily tif files (failures are written to the message log)
         if copy_tif_files:
             self._copy_tif_files(settings)
 
@@ -235,19 +301,19 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
         daily_map_path = self.layer_handler.get_output_path_for_shape(
             'cyano_daymap_', daily_outpath)
         self.layer_handler.save_shapefile(layer_name=layer_name,
-                                          path=daily_map_path,
-                                          output_prefix='cyano_daymap_')
+                                          path=daily_map_path)
 
         # Rasterize the daily map. Super duper much more efficient than merging
         # shapefiles when creating 7day composites
         self.raster_handler.rasterize(daily_map_path)
+        self._archive_daymap(settings, daily_map_path.replace('.shp', '.tiff'))
         print("Daily shape/raster session completed in --%.1f sec"
               "\n" % (time.time() - start_time))
 
         # Sea Track Web output
         if create_stw_files:
-            utils.thread_process(
-                subprocesses.create_stw,
+            stw_task = executor.submit(
+                'cpu', subprocesses.create_stw,
                 daily_map_path,
                 settings.current_working_date,
                 *settings.baws_10000_paths
@@ -271,110 +337,31 @@ class BAWSAlgorithm(QgsProcessingAlgorithm):
             text_handler = handlers.TextFileHandler(settings,
                                                     auto=auto_generate_text,
                                                     daymap_path=daily_map_path)
-            utils.thread_process(text_handler.copy_empty_files)
+            text_task = executor.submit('cpu', text_handler.copy_empty_files)
 
         if create_stw_files:
-            self._check_for_stw_file(settings, gui_mxb)
-
-    @staticmethod
-    def _check_for_stw_file(settings, gui_func):
-        """Search for the creation of the SeaTrackWeb file."""
-        stw_path = os.path.join(
-            settings.baws_USER_SELECTED_current_production_directory,
-            '_'.join(['stw', settings.current_working_date]) + '.txt'
-        )
-        remove_file = False
-        with open(stw_path) as searchfile:
-            found = False
-            while not found:
-                for line in searchfile:
-                    if 'no_stw' in line:
-                        gui_func('No large surface accumulations and therefore '
-                                 'no drift forecast is needed.')
-                        found = True
-                        remove_file = True
-                        break
-                    elif '' in line:
-                        found = True
-                        gui_func(
-                            'A SeaTrackWeb file has been saved. '
-                            'Perform forecast on stw.smhi.se',
-                            picture_path=':/plugins/BAWS/resources/stw_pic.png'
-                        )
-                        break
-                else:
-                    # reset file to the beginning for next search
-                    searchfile.seek(0)
-                    time.sleep(0.05)
-        if remove_file:
-            searchfile.close()
-            try:
-                os.remove(stw_path)
-            except:
-                pass
-
-    def daily_map(self, shape_handler, file_path=''):
-        """Produce the daily Cyano-PNG-map over the Baltic Sea."""
-        print('Creating daily PNG-map..')
-        directory = Path(__file__).parent
-
-        self.plot_handler.add_picture_to_figure(
-            self.plot_handler.day_figure,
-            path_picture=str(directory.joinpath('resources/smhi-logo.png')),
-            axes_settings=[0.835, 0.86, 0.1, 0.12]
-        )
-
-        self.plot_handler.add_picture_to_figure(
-            self.plot_handler.day_figure,
-            path_picture=str(directory.joinpath('resources/daily_legend.png')),
-            axes_settings=[0.74, 0.056, 0.2, 0.2]
-        )
-
-        patches = shape_handler.get_matplotlib_patches(
-            self.plot_handler.map_obj,
-            self.plot_handler.day_colormap_properties
-        )
-        self.plot_handler.plot_patches(
-            patches,
-            map_axes=self.plot_handler.day_axes
-        )
-
-        self.plot_handler.save_figure(
-            file_path.replace('.shp', '.png'),
-            self.plot_handler.day_figure
-        )
-        print('Daily PNG-map saved!')
-
-    def weekly_map(self, shape_handler, file_path=''):
-        """Produce the weekly Cyano-PNG-map over the Baltic Sea."""
-        print('Creating weekly PNG-map..')
-        if not file_path:
-            return
-
-        directory = Path(__file__).parent
-        self.plot_handler.add_picture_to_figure(
-            self.plot_handler.week_figure,
-            path_picture=str(directory.joinpath('resources/smhi-logo.png')),
-            axes_settings=[0.835, 0.86, 0.1, 0.12]
-        )
+            self._check_for_stw_file(stw_task, gui_mxb)
 
-        self.plot_handler.add_picture_to_figure(
-            self.plot_handler.week_figure,
-            path_picture=str(directory.joinpath('resources/weekly_legend.png')),
-            axes_settings=[0.728, 0.057, 0.3, 0.3]
-        )
+        if create_text_files:
+            tasks.wait_for(text_task, timeout=TASK_TIMEOUT,
+                           name='Creation of text files')
 
-        patches = shape_handler.get_matplotlib_patches(
-            self.plot_handler.map_obj,
-            self.plot_handler.week_colormap_properties
-        )
-        self.plot_handler.plot_patches(
-            patches,
-            map_axes=self.plot_handler.week_axes
-        )
+    @staticmethod
+    def _check_for_stw_file(stw_task, gui_func):
+        """Wait for the creation of the SeaTrackWeb file and inform the user.
 
-        self.plot_handler.save_figure(
-            file_path.replace('.shp', '.png'),
-            self.plot_handler.week_figure
-        )
-        print('Weekly PNG-map saved!')
+        Args:
+            stw_task: Future of subprocesses.create_stw.
+            gui_func: Function to show a message in the GUI.
+        """
+        stw_path = tasks.wait_for(stw_task, timeout=TASK_TIMEOUT,
+                                  name='Creation of SeaTrackWeb file')
+        if stw_path:
+            gui_func(
+                'A SeaTrackWeb file has been saved. '
+                'Perform forecast on stw.smhi.se',
+                picture_path=':/plugins/BAWS/resources/stw_pic.png'
+            )
+        else:
+            gui_func('No large surface accumulations and therefore '
+                     'no drift forecast is needed.')
@@ -14,8 +14,9 @@ from distutils.dir_util import copy_tree
 from datetime import datetime
 import pandas as pd
 
+from . import executor
 from . import handlers
-from . import utils
+from .handlers import raster_cache
 from .__init__ import __version__
 
 
@@ -80,10 +81,43 @@ class Settings:
         self.user_temporary_folder = Path('~').expanduser().joinpath(
             'baws_temp')
         self.create_folder(self.user_temporary_folder)
-        utils.thread_process(self.reset_folder, self.user_temporary_folder)
+        # Pre-rendered basemaps of the PNG maps (kept between sessions).
+        self.map_cache_folder = Path('~').expanduser().joinpath(
+            'baws_map_cache')
+        self.create_folder(self.map_cache_folder)
 
         self.jh = handlers.JSONHandler()
         self._load_settings()
+        # Memory mapped copies of the class rasters (raster_cache.read_band).
+        # Configured before any worker process is started, the folder is
+        # passed on to them in the environment.
+        self.raster_cache_folder = Path('~').expanduser().joinpath(
+            'baws_raster_cache')
+        raster_cache.configure(
+            self.raster_cache_folder
+            if getattr(self, 'baws_raster_cache', True) else None)
+        # Memory budget (MB) of the session cache of raster arrays.
+        raster_cache.set_memory_budget(
+            getattr(self, 'baws_raster_memory_mb', 512) * 1024 ** 2)
+        # Threads of the executor queues, null keeps the default
+        # (executor.DEFAULT_WORKERS).
+        executor.configure(io=getattr(self, 'baws_io_workers', None),
+                           cpu=getattr(self, 'baws_cpu_workers', None))
+        # Rasterization waits for this (BAWSAlgorithm.rasterize_shapefiles).
+        self.temporary_folder_ready = executor.submit(
+            'io', self.reset_folder, self.user_temporary_folder)
+        # Production grid, 1000 m or 300 m resolution. Chosen once and then
+        # passed on to the raster handler and auto texting.
+        self.grid = handlers.get_grid(
+            getattr(self, 'baws_grid_resolution', 1000))
+        # Merge scenes block window by block window (low memory usage).
+        # Default (null): on grids finer than 1000 m.
+        self.tiled_merge = getattr(self, 'baws_tiled_merge', None)
+        if self.tiled_merge is None:
+            self.tiled_merge = self.grid.resolution < 1000
+        # Blooms on the PNG maps from the class rasters ('raster') or as
+        # polygon patches ('patches').
+        self.map_render_mode = getattr(self, 'baws_map_render_mode', 'raster')
 
         self.copy_folder_tree(self.server_info_directory,
                               self.local_server_info_directory)
@@ -201,8 +235,8 @@ class Settings:
             if user_answer:
                 for fid in glob.glob(
                         self.baws_USER_SELECTED_current_production_directory + '/*'):
-                    utils.thread_process(os.remove, fid)
-                    # os.remove(fid)
+                    executor.submit('io', os.remove, fid)
+                executor.drain('io')
                 print(f'All files deleted from folder: '
                       f'{self.baws_USER_SELECTED_current_production_directory}')
         else:
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 15:02
+
+@author: a002028
+
+Shared background executor with named queues.
+
+    io:  file copying, deletion and writing (few workers, to not thrash the
+         disk)
+    cpu: production work (STW file, text files, map figures)
+
+Usage:
+    future = executor.submit('io', copyfile, src, dst)
+    executor.drain('io')   # wait for all queued io work before continuing
+"""
+import os
+import traceback
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import tasks
+
+
+DEFAULT_WORKERS = {
+    'io': 2,
+    'cpu': max(1, min(4, (os.cpu_count() or 2) - 1)),
+}
+
+
+def log_message(message, level='Info'):
+    """Write message to the QGIS message log (BAWS tab), print if no QGIS.
+
+    Args:
+        message: Text.
+        level: Qgis.MessageLevel name, eg. 'Info', 'Warning', 'Critical'.
+    """
+    try:
+        from qgis.core import Qgis, QgsMessageLog
+        QgsMessageLog.logMessage(message, 'BAWS', getattr(Qgis, level))
+    except ImportError:
+        pass
+    print(message)
+
+
+class BackgroundExecutor:
+    """Thread pools with named queues, exception capture and drain."""
+
+    def __init__(self, workers=None):
+        """Initialize.
+
+        Args:
+            workers: Dictionary {queue name: number of workers}.
+        """
+        self.workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        self._pools = {}
+        self._pending = {}
+        self._lock = Lock()
+
+    def configure(self, **workers):
+        """Set the number of workers per queue, eg. configure(io=2, cpu=3).
+
+        Only affects queues that have not been started yet.
+        """
+        self.workers.update(
+            {name: max(1, int(n)) for name, n in workers.items() if n})
+
+    def _get_pool(self, queue):
+        """Return thread pool of the queue, start it if needed."""
+        if queue not in self.workers:
+            raise KeyError('Unknown executor queue: %s (available: %s)'
+                           % (queue, ', '.join(self.workers)))
+        if queue not in self._pools:
+            self._pools[queue] = ThreadPoolExecutor(
+                max_workers=self.workers[queue],
+                thread_name_prefix='baws_%s' % queue
+            )
+            self._pending[queue] = set()
+        return self._pools[queue]
+
+    def submit(self, queue, call_function, *args, **kwargs):
+        """Queue function and return a Future for its result.
+
+        Exceptions are written to the QGIS message log.
+
+        Args:
+            queue: Name of the queue ('io' or 'cpu').
+            call_function: Function to run.
+            *args: Arguments to pass to function.
+            **kwargs: Keyword arguments to pass to function.
+        """
+        name = getattr(call_function, '__name__', str(call_function))
+        with self._lock:
+            future = self._get_pool(queue).submit(
+                call_function, *args, **kwargs)
+            self._pending[queue].add(future)
+
+        def _done(f):
+            with self._lock:
+                self._pending.get(queue, set()).discard(f)
+            if not f.cancelled() and f.exception() is not None:
+                # Reported when the task fails. Callers that depend on the
+                # result wait on the future, which raises.
+                exc = f.exception()
+                log_message('Background task %s (%s queue) failed: %s\n%s' % (
+                    name, queue, exc, ''.join(traceback.format_exception(
+                        type(exc), exc, exc.__traceback__))), 'Critical')
+
+        future.add_done_callback(_done)
+        return future
+
+    def drain(self, queue=None, timeout=None):
+        """Wait for all queued work to finish.
+
+        Failed tasks do not make drain raise, they are logged when they
+        fail (see submit). Wait on the future of a task to get its error.
+
+        Args:
+            queue: Name of the queue, or None for all queues.
+            timeout: Max number of seconds to wait.
+
+        Raises:
+            tasks.TaskError: If the work did not finish within timeout.
+        """
+        queues = [queue] if queue else list(self._pending)
+        with self._lock:
+            futures = [f for q in queues for f in self._pending.get(q, ())]
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise tasks.TaskError(
+                'Background work (%s) did not finish within %s sec'
+                % (', '.join(queues), timeout))
+
+    def shutdown(self, wait=True):
+        """Shutdown all queues. Queued work that has not started is cancelled.
+
+        Args:
+            wait: If True, wait for running tasks to finish.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._pending.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_EXECUTOR = BackgroundExecutor()
+
+
+def configure(**workers):
+    """Set number of workers per queue of the shared executor."""
+    _EXECUTOR.configure(**workers)
+
+
+def submit(queue, call_function, *args, **kwargs):
+    """Queue function on the shared executor (see BackgroundExecutor)."""
+    return _EXECUTOR.submit(queue, call_function, *args, **kwargs)
+
+
+def drain(queue=None, timeout=None):
+    """Wait for queued work on the shared executor."""
+    return _EXECUTOR.drain(queue=queue, timeout=timeout)
+
+
+def shutdown(wait=True):
+    """Shutdown the shared executor."""
+    _EXECUTOR.shutdown(wait=wait)
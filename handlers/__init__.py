@@ -6,13 +6,30 @@ Created on 2019-05-22 12:03
 
 """
 from .auto_texting import DayTexting, WeekTexting
+from .bloom_archive import BloomArchive
 from .boolean import BaseBoolean
+from .composite import CompositeStore
+from .districts import DistrictIndex, get_district_index
 from .ferry_box import FerryBoxHandler
+from .grid import BAWSGrid, get_grid
 from .jsonH import JSONHandler
-from .layer import LayerHandler, DailyShapeHandler, WeeklyShapeHandler
-from .map import MapHandler
+from .merge import SceneMerger
 from .raster import RasterHandler
 from .reanalysis import ReanalysisHandler
+from .stat_store import StatisticsStore
 from .statistics import StatHandler
 from .text import TextFileHandler
 from .update_test import TESTHandler
+from .zonal import ZonalStatistics
+
+try:
+    from .layer import LayerHandler, DailyShapeHandler, WeeklyShapeHandler
+except ImportError:
+    # QGIS is not available (headless batch runs, see batch.py).
+    pass
+
+try:
+    from .map import MapHandler
+except ImportError:
+    # basemap is only needed for the map figures, not in batch runs.
+    pass
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 19:10
+
+@author: a002028
+"""
+import numpy as np
+from scipy import ndimage
+
+
+def small_regions(mask, min_pixels):
+    """Return boolean array of the regions in mask with < min_pixels cells.
+
+    Regions are 4-connected, the same as the polygons from
+    rasterio.features.shapes, so a region of n cells is a polygon with the
+    area n * cell area.
+
+    Args:
+        mask: Boolean array.
+        min_pixels: Smallest number of cells of a region to keep.
+    """
+    labels, nr_regions = ndimage.label(mask)
+    if not nr_regions:
+        return np.zeros(mask.shape, dtype=bool)
+    small = np.bincount(labels.ravel()) < min_pixels
+    small[0] = False
+    return small[labels]
+
+
+def remove_small_areas(array, classes, min_area, grid, fill=0):
+    """Set regions of classes that are smaller than min_area to fill.
+
+    All classes are seen as one region, eg. classes=(2, 3) for blooms. The
+    array is changed in place.
+
+    Args:
+        array: Class array.
+        classes: Iterable of class values.
+        min_area: Smallest area (m2) of a region to keep.
+        grid: BAWSGrid of the array.
+        fill: Class value of the removed regions.
+
+    Returns:
+        Number of removed cells.
+    """
+    small = small_regions(np.isin(array, classes),
+                          grid.area_to_pixels(min_area))
+    array[small] = fill
+    return int(np.count_nonzero(small))
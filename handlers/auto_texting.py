@@ -6,8 +6,7 @@ Created on 2022-07-08 16:40
 
 @author: johannes
 """
-import rasterio as rio
-import numpy as np
+from .districts import get_district_index
 
 
 def get_area_name_string_list(areas, lang='swe'):
@@ -87,13 +86,6 @@ def get_day_bloom_area_lists(maxes, lang=None, mapper=None):
     return surfs, subs
 
 
-def open_raster(fid):
-    """Doc."""
-    rst = rio.open(fid)
-    _array = rst.read()
-    return _array[0]
-
-
 class WeekTexting:
     """Doc."""
     swe_text = 'Sammanställning av de 7 senaste dagarna ({START_DATE} - ' \
@@ -102,9 +94,10 @@ class WeekTexting:
                '{END_DATE}): {TEXT} Written by: {USER_NAME}'
 
     def __init__(self, path_to_districts, *args, user=None, text_mapper=None,
-                 end_date=None, start_date=None, weekmap_path=None, **kwargs):
+                 end_date=None, start_date=None, weekmap_path=None, grid=None,
+                 **kwargs):
         self.mapper = text_mapper
-        self.districts = open_raster(path_to_districts)
+        self.index = get_district_index(path_to_districts, grid=grid)
         self.user = user
         self.tiff_path = weekmap_path
         self.end_date = end_date
@@ -112,8 +105,8 @@ class WeekTexting:
 
     def get_text(self, lang=None):
         """Doc."""
-        data = open_raster(self.tiff_path)
-        week_text = self.generate_descriptive_text(data, lang=lang)
+        table = self.index.file_class_counts(self.tiff_path)
+        week_text = self.generate_descriptive_text(table, lang=lang)
         text_place_holder = self.eng_text if lang == 'eng' else self.swe_text
         return text_place_holder.format(
             START_DATE=self.start_date,
@@ -122,13 +115,14 @@ class WeekTexting:
             USER_NAME=self.user
         )
 
-    def generate_descriptive_text(self, data, *args, lang=None, **kwargs):
-        """Doc."""
-        not_zero = np.logical_and(data != 0, self.districts != 0)
-        maxes = {}
-        for area in np.unique(self.districts[not_zero]):
-            area_boolean = np.logical_and(not_zero, self.districts == area)
-            maxes.setdefault(area, data[area_boolean].max())
+    def generate_descriptive_text(self, table, *args, lang=None, **kwargs):
+        """Doc.
+
+        Args:
+            table: Pixel counts per district and value
+                   (DistrictIndex.class_counts of the weekmap).
+        """
+        maxes = self.index.max_values(table)
 
         few, multi = get_week_bloom_area_lists(maxes, lang=lang,
                                                mapper=self.mapper)
@@ -158,25 +152,18 @@ class DayTexting:
                'Written by: {USER_NAME}'
 
     def __init__(self, path_to_districts, *args,
-                 user=None, text_mapper=None, daymap_path=None, **kwargs):
+                 user=None, text_mapper=None, daymap_path=None, grid=None,
+                 **kwargs):
         self.mapper = text_mapper
-        self.districts = open_raster(path_to_districts)
+        self.index = get_district_index(path_to_districts, grid=grid)
         self.user = user
         self.tiff_path = daymap_path
-        self.district_sizes = {i: np.count_nonzero(self.districts == i)
-                               for i in range(1, self.districts.max() + 1)}
-
-        self.group_district_sizes = {
-            '-'.join(map(str, group)): np.count_nonzero(
-                np.isin(self.districts, group))
-            for group in [[4, 5, 6], [7, 8], [9], [12, 13]]
-        }
 
     def get_text(self, lang=None):
         """Doc."""
-        data = open_raster(self.tiff_path)
-        weather_text = self.generate_weather_text(data, lang=lang)
-        bloom_text = self.generate_bloom_text(data, lang=lang)
+        table = self.index.file_class_counts(self.tiff_path)
+        weather_text = self.generate_weather_text(table, lang=lang)
+        bloom_text = self.generate_bloom_text(table, lang=lang)
         text_place_holder = self.eng_text if lang == 'eng' else self.swe_text
         return text_place_holder.format(
             WEATHER=weather_text,
@@ -184,15 +171,14 @@ class DayTexting:
             USER_NAME=self.user
         )
 
-    def generate_weather_text(self, data, *args, lang=None, **kwargs):
-        """Doc."""
-        clouds = data == 1
-        sizes = {}
-        for group, area in self.group_district_sizes.items():
-            group_list = [int(v) for v in group.split('-')]
-            size = np.count_nonzero(
-                np.logical_and(clouds, np.isin(self.districts, group_list)))
-            sizes.setdefault(group, round(float(size) / area, 2))
+    def generate_weather_text(self, table, *args, lang=None, **kwargs):
+        """Doc.
+
+        Args:
+            table: Pixel counts per district and value
+                   (DistrictIndex.class_counts of the daymap).
+        """
+        sizes = self.index.group_ratios(table, 1)
 
         text_list = []
         for ratio_range, item in self.mapper['cloud_ratio_description'].items():
@@ -210,14 +196,14 @@ class DayTexting:
             text_list.append(names)
         return ' '.join(text_list)
 
-    def generate_bloom_text(self, data, *args, lang=None, **kwargs):
-        """Doc."""
-        blooms = np.logical_and(np.logical_or(data == 2, data == 3),
-                                self.districts != 0)
-        maxes = {}
-        for area in np.unique(self.districts[blooms]):
-            area_boolean = np.logical_and(blooms, self.districts == area)
-            maxes.setdefault(area, data[area_boolean].max())
+    def generate_bloom_text(self, table, *args, lang=None, **kwargs):
+        """Doc.
+
+        Args:
+            table: Pixel counts per district and value
+                   (DistrictIndex.class_counts of the daymap).
+        """
+        maxes = self.index.max_values(table, values=(2, 3))
 
         surfs, subs = get_day_bloom_area_lists(maxes, lang=lang,
                                                mapper=self.mapper)
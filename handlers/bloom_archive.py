@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 17:02
+
+@author: a002028
+"""
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+from .composite import date_from_path, pack_bloom_mask
+from .raster import read_class_raster
+
+
+# Default season (MMDD - MMDD). Days outside the season are not archived.
+SEASON = ('0501', '0930')
+
+# Archives are written from the worker threads of the io queue. Creation and
+# the read-modify-write of the json file are done one at a time.
+_LOCK = threading.RLock()
+
+
+class BloomArchive:
+    """Bit-packed daily bloom presence for one season.
+
+    One memory-mapped .npy file per season with one row per day
+    (np.packbits of the flattened bloom mask) and a small json file that
+    tells which days have been added and the shape of the grid.
+
+        bloom_archive_2026.npy
+        bloom_archive_2026.json
+
+    Example:
+        archive = BloomArchive(directory, 2026, shape=(1400, 1400))
+        archive.add_file('.../cyano_daymap_20260715.tiff')
+        week = archive.count('20260709', '20260715')
+    """
+
+    def __init__(self, directory, year, shape=None, season=SEASON):
+        """Initialize.
+
+        Args:
+            directory: Folder of the archive files.
+            year: Season (year).
+            shape: Grid shape, needed when a new archive is created.
+            season: (MMDD, MMDD) first and last day of the season.
+        """
+        self.year = int(year)
+        self.path = os.path.join(directory, 'bloom_archive_%i.npy' % self.year)
+        self.meta_path = self.path.replace('.npy', '.json')
+
+        # Locked, so two archives of the same season are not created at once.
+        with _LOCK:
+            if os.path.isfile(self.meta_path):
+                meta = self._read_meta()
+                self.shape = tuple(meta['shape'])
+                self.start = pd.Timestamp(meta['start'])
+                self.end = pd.Timestamp(meta['end'])
+                self._days = set(meta['days'])
+                if shape and tuple(shape) != self.shape:
+                    raise ValueError('Archive %s has shape %s, not %s'
+                                     % (self.path, self.shape, tuple(shape)))
+                self.data = np.load(self.path, mmap_mode='r+')
+            else:
+                if not shape:
+                    raise ValueError('shape is needed to create a new archive')
+                self.shape = tuple(shape)
+                self.start = pd.Timestamp('%i%s' % (self.year, season[0]))
+                self.end = pd.Timestamp('%i%s' % (self.year, season[1]))
+                self._days = set()
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                self.data = np.lib.format.open_memmap(
+                    self.path, mode='w+', dtype=np.uint8,
+                    shape=(self.nr_season_days, -(-self.size // 8))
+                )
+                self._save_meta()
+
+    @property
+    def size(self):
+        """Return number of grid cells."""
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def nr_season_days(self):
+        """Return number of days in the season."""
+        return (self.end - self.start).days + 1
+
+    @property
+    def days(self):
+        """Return sorted list of archived dates (YYYYMMDD)."""
+        return sorted(self._days)
+
+    def in_season(self, date):
+        """Return True if date is within the season."""
+        return self.start <= pd.Timestamp(date) <= self.end
+
+    def day_index(self, date):
+        """Return row index of date.
+
+        Args:
+            date: Date string (YYYYMMDD) or timestamp.
+        """
+        index = (pd.Timestamp(date) - self.start).days
+        if not 0 <= index < self.nr_season_days:
+            raise ValueError('%s is outside of the season %s - %s' % (
+                date, self.start.strftime('%Y%m%d'),
+                self.end.strftime('%Y%m%d')))
+        return index
+
+    def index_date(self, index):
+        """Return date string (YYYYMMDD) of row index."""
+        return (self.start + pd.Timedelta(days=int(index))).strftime('%Y%m%d')
+
+    def _read_meta(self):
+        """Return the content of the json file."""
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    def _save_meta(self):
+        """Write the json file."""
+        meta = {
+            'shape': list(self.shape),
+            'start': self.start.strftime('%Y%m%d'),
+            'end': self.end.strftime('%Y%m%d'),
+            'days': self.days,
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def add_day(self, date, array):
+        """Add (or replace) the bloom mask of one day.
+
+        Args:
+            date: Date string (YYYYMMDD) or timestamp.
+            array: Daily class array (bloom = class 2 or 3).
+        """
+        if array.shape != self.shape:
+            raise ValueError('Array shape %s does not match archive shape %s'
+                             % (array.shape, self.shape))
+        index = self.day_index(date)
+        mask = pack_bloom_mask(array)
+        with _LOCK:
+            self.data[index] = mask
+            self.data.flush()
+            # Other archive objects of the season may have added days since
+            # this one was opened, their days are kept.
+            self._days = set(self._read_meta()['days'])
+            self._days.add(pd.Timestamp(date).strftime('%Y%m%d'))
+            self._save_meta()
+
+    def add_file(self, path):
+        """Add daymap raster to the archive, the date is taken from the name.
+
+        Args:
+            path: Path to daymap raster (eg. cyano_daymap_20260715.tiff).
+        """
+        self.add_day(date_from_path(path), read_class_raster(path))
+
+    def _day_range(self, start=None, end=None):
+        """Return list of archived row indices between start and end."""
+        first = self.day_index(start) if start else 0
+        last = self.day_index(end) if end else self.nr_season_days - 1
+        return [i for i in (self.day_index(d) for d in self.days)
+                if first <= i <= last]
+
+    def _iter_masks(self, indices, chunk_size=16):
+        """Yield (index, uint8 mask 0/1) per day, unpacking chunks of days."""
+        for i in range(0, len(indices), chunk_size):
+            rows = indices[i:i + chunk_size]
+            bits = np.unpackbits(self.data[rows], axis=1, count=self.size)
+            for index, mask in zip(rows, bits):
+                yield index, mask.reshape(self.shape)
+
+    def get_day(self, date):
+        """Return boolean bloom mask of date."""
+        index = self.day_index(date)
+        return np.unpackbits(
+            self.data[index], count=self.size).reshape(self.shape) == 1
+
+    def count(self, start=None, end=None):
+        """Return number of bloom days per pixel between start and end.
+
+        Works for any window, eg. 7, 14, 30 days or the whole season.
+
+        Args:
+            start: First date (default: start of season).
+            end: Last date (default: end of season).
+        """
+        indices = self._day_range(start, end)
+        dtype = np.uint8 if len(indices) < 256 else np.uint16
+        counts = np.zeros(self.shape, dtype=dtype)
+        for _, mask in self._iter_masks(indices):
+            counts += mask
+        return counts
+
+    def count_last_days(self, end, nr_days=7):
+        """Return bloom count of the nr_days ending with end (inclusive)."""
+        start = pd.Timestamp(end) - pd.Timedelta(days=nr_days - 1)
+        return self.count(start=max(start, self.start), end=end)
+
+    def first_last_bloom_day(self, start=None, end=None):
+        """Return row index of first and last bloom day per pixel.
+
+        Pixels without bloom get -1. Use index_date to get the date.
+
+        Args:
+            start: First date (default: start of season).
+            end: Last date (default: end of season).
+        """
+        first = np.full(self.shape, -1, dtype=np.int16)
+        last = np.full(self.shape, -1, dtype=np.int16)
+        for index, mask in self._iter_masks(self._day_range(start, end)):
+            bloom = mask.view(bool)
+            first[np.logical_and(bloom, first < 0)] = index
+            last[bloom] = index
+        return first, last
+
+    def frequency(self, start=None, end=None):
+        """Return share (0-1) of archived days with bloom per pixel.
+
+        Args:
+            start: First date (default: start of season).
+            end: Last date (default: end of season).
+        """
+        nr_days = len(self._day_range(start, end))
+        if not nr_days:
+            return np.zeros(self.shape, dtype=np.float32)
+        return self.count(start, end).astype(np.float32) / nr_days
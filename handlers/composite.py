@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 16:05
+
+@author: a002028
+"""
+import os
+import re
+import numpy as np
+import rasterio as rio
+
+from .raster import COUNT_DTYPE, as_class_array, check_class_array
+from .raster_cache import read_band
+from .raster_profile import PRODUCT_COMPRESSION, write_raster
+
+
+def bloom_mask(array):
+    """Return boolean array, True where class is 2 or 3 (bloom)."""
+    return np.logical_or(array == 2, array == 3)
+
+
+def pack_bloom_mask(array):
+    """Return bloom mask of class array packed to bits (flat uint8 array)."""
+    return np.packbits(bloom_mask(array), axis=None)
+
+
+def unpack_bloom_mask(packed, shape):
+    """Return uint8 array (0/1) of packed bloom mask.
+
+    Args:
+        packed: Flat array from pack_bloom_mask.
+        shape: Shape of the original array.
+    """
+    return np.unpackbits(
+        packed, count=shape[0] * shape[1]).reshape(shape)
+
+
+def file_key(path):
+    """Return key that changes when the file changes."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def date_from_path(path):
+    """Return date string (YYYYMMDD) of a BAWS file name."""
+    match = re.search(r'(\d{8})', os.path.basename(path))
+    if not match:
+        raise ValueError('Could not find date in file name: %s' % path)
+    return match.group(1)
+
+
+def write_weekmap(count, meta, path):
+    """Write weekmap raster (number of bloom days per pixel).
+
+    Args:
+        count: Bloom count array (COUNT_DTYPE).
+        meta: rasterio meta data of the daymaps.
+        path: Path to the weekmap raster.
+    """
+    print('writing to {}'.format(path))
+    return write_raster(path, check_class_array(count, dtype=COUNT_DTYPE),
+                        meta, compression=PRODUCT_COMPRESSION['weekmap'])
+
+
+class CompositeStore:
+    """Rolling bloom count over a window of daily class rasters.
+
+    Daily bloom masks are kept bit-packed, keyed by date and the file key
+    (path, mtime, size). When the window moves, only the day that fell out is
+    subtracted and the new day is added. A re-saved day is read again and
+    only its own contribution is replaced.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self.count = None
+        self.shape = None
+        self.meta = None
+        self._masks = {}
+        self._contributions = {}
+        self.nr_reads = 0
+
+    def _get_mask(self, date, path):
+        """Return (key, packed mask) of date, read the file only if needed."""
+        key = file_key(path)
+        cached = self._masks.get(date)
+        if cached and cached[0] == key:
+            return cached
+
+        print('Adding {} to composite file selection'.format(
+            os.path.basename(path)))
+        if self.meta is None:
+            with rio.open(path) as rst:
+                self.meta = rst.meta.copy()
+        array = as_class_array(read_band(path))
+        self.nr_reads += 1
+        if self.shape is None:
+            self.shape = array.shape
+        elif array.shape != self.shape:
+            raise ValueError('Raster {} has shape {}, expected {}'.format(
+                path, array.shape, self.shape))
+        self._masks[date] = (key, pack_bloom_mask(array))
+        return self._masks[date]
+
+    def _add(self, date, key, packed, sign=1):
+        """Add (sign=1) or subtract (sign=-1) the mask of date to count."""
+        mask = unpack_bloom_mask(packed, self.shape)
+        if sign > 0:
+            self.count += mask
+            self._contributions[date] = (key, packed)
+        else:
+            self.count -= mask
+            self._contributions.pop(date)
+
+    def update(self, paths):
+        """Update and return the bloom count for the given daily rasters.
+
+        Args:
+            paths: Iterable of paths to daily class rasters (one per date).
+        """
+        files = {date_from_path(path): path for path in paths}
+        if not files:
+            raise ValueError('No daily rasters given for the composite')
+        new_masks = {date: self._get_mask(date, path)
+                     for date, path in files.items()}
+
+        if self.count is None:
+            self.count = np.zeros(self.shape, dtype=COUNT_DTYPE)
+
+        for date, (key, packed) in list(self._contributions.items()):
+            if date not in new_masks or new_masks[date][0] != key:
+                self._add(date, key, packed, sign=-1)
+
+        for date, (key, packed) in new_masks.items():
+            if date not in self._contributions:
+                self._add(date, key, packed)
+
+        # Only keep the days that are in the current window.
+        self._masks = {date: self._masks[date] for date in new_masks}
+        return self.count
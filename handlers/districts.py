@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 20:05
+
+@author: a002028
+"""
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+
+from .composite import file_key
+from .raster import as_class_array
+from .raster_cache import read_band
+
+
+# District groups used for the cloud cover text.
+CLOUD_GROUPS = ([4, 5, 6], [7, 8], [9], [12, 13])
+
+# Number of possible values of a class or count raster (uint8).
+NR_VALUES = 256
+
+
+class DistrictIndex:
+    """The districts raster as a flat label array with lookup tables.
+
+    A class (or count) raster is turned into a table of pixel counts per
+    district and value with one np.bincount. Everything the texts need (max
+    class per district, cloud ratios) is then read from the table.
+    """
+
+    def __init__(self, districts, cache_size=4):
+        """Initialize.
+
+        Args:
+            districts: Array with district numbers (0: no district).
+            cache_size: Number of raster files to keep count tables for.
+        """
+        districts = as_class_array(districts)
+        self.shape = districts.shape
+        self.nr_districts = int(districts.max()) + 1
+        # District number in the high byte, raster value in the low byte.
+        self._offsets = districts.ravel().astype(np.uint16) << 8
+        self.sizes = np.bincount(districts.ravel(),
+                                 minlength=self.nr_districts)
+        self.group_sizes = {
+            '-'.join(map(str, group)): int(self.sizes[
+                [i for i in group if i < self.nr_districts]].sum())
+            for group in CLOUD_GROUPS
+        }
+        self.cache_size = cache_size
+        self._tables = OrderedDict()
+
+    def class_counts(self, data):
+        """Return pixel counts per district and value.
+
+        Args:
+            data: Class or count array (uint8) on the districts grid.
+
+        Returns:
+            Array (number of districts, 256), eg. table[5, 2] is the number
+            of class 2 pixels in district 5.
+        """
+        data = as_class_array(data)
+        if data.shape != self.shape:
+            raise ValueError('Raster shape %s does not match the districts %s'
+                             % (data.shape, self.shape))
+        return np.bincount(
+            self._offsets | data.ravel(),
+            minlength=self.nr_districts * NR_VALUES
+        ).reshape(self.nr_districts, NR_VALUES)
+
+    def file_class_counts(self, path):
+        """Return class_counts of a raster file, cached by file key."""
+        key = file_key(path)
+        if key not in self._tables:
+            self._tables[key] = self.class_counts(read_band(path))
+            while len(self._tables) > self.cache_size:
+                self._tables.popitem(last=False)
+        return self._tables[key]
+
+    @staticmethod
+    def max_values(table, values=None):
+        """Return {district: highest value with pixels in the district}.
+
+        District 0 (outside all districts) is left out.
+
+        Args:
+            table: Table from class_counts.
+            values: Iterable of values to look at (default: all but 0).
+        """
+        selected = np.zeros(table.shape[1], dtype=bool)
+        if values is None:
+            selected[1:] = True
+        else:
+            selected[list(values)] = True
+        present = (table > 0) & selected
+        maxes = {}
+        for district in np.flatnonzero(present[1:].any(axis=1)) + 1:
+            maxes[int(district)] = int(np.flatnonzero(present[district])[-1])
+        return maxes
+
+    def group_ratios(self, table, value):
+        """Return {group: share of the group area with value}.
+
+        Args:
+            table: Table from class_counts.
+            value: Raster value, eg. 1 for clouds.
+        """
+        counts = table[:, value]
+        ratios = {}
+        for group in CLOUD_GROUPS:
+            name = '-'.join(map(str, group))
+            size = counts[[i for i in group if i < self.nr_districts]].sum()
+            ratios[name] = round(float(size) / self.group_sizes[name], 2)
+        return ratios
+
+
+@lru_cache(maxsize=4)
+def get_district_index(path, grid=None):
+    """Return DistrictIndex of the districts raster (cached for the session).
+
+    Args:
+        path: Path to the districts raster.
+        grid: BAWSGrid to read the districts onto.
+    """
+    if grid:
+        return DistrictIndex(grid.read(str(path)))
+    return DistrictIndex(read_band(path))
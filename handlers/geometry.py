@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 19:30
+
+@author: a002028
+"""
+import numpy as np
+import shapely
+import geopandas as gpd
+
+
+def repair_geometries(gdf):
+    """Repair invalid geometries with make_valid (only the invalid ones).
+
+    Validity is tested for all geometries at once. The result is exploded to
+    polygons and parts that are not polygons (make_valid can give lines or
+    points along a bowtie) are dropped. The order of the rows is kept.
+
+    Args:
+        gdf: GeoDataFrame with polygons.
+
+    Returns:
+        (GeoDataFrame, number of repaired geometries)
+    """
+    geoms = np.asarray(gdf.geometry.array)
+    invalid = ~shapely.is_valid(geoms) & ~shapely.is_missing(geoms)
+    nr_repaired = int(np.count_nonzero(invalid))
+    if not nr_repaired:
+        return gdf, 0
+
+    geoms = geoms.copy()
+    geoms[invalid] = shapely.make_valid(geoms[invalid])
+    gdf = gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index,
+                                         crs=gdf.crs))
+    gdf = gdf.explode(index_parts=False)
+    return gdf[gdf.geom_type == 'Polygon'], nr_repaired
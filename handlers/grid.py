@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 11:05
+
+@author: a002028
+"""
+import numpy as np
+import rasterio
+from rasterio.warp import reproject, Resampling
+
+from .raster_cache import read_band
+
+
+class BAWSGrid:
+    """The BAWS production grid (SWEREF99 TM).
+
+    The resolution is chosen once (see Settings.grid) and the grid object is
+    then passed on to everything that creates, merges or polygonizes rasters.
+    """
+
+    def __init__(self, resolution, bounds, shape, epsg=3006):
+        """Initialize.
+
+        Args:
+            resolution: Cell size in meters.
+            bounds: (west, south, east, north)
+            shape: (height, width)
+            epsg: EPSG code of the grid.
+        """
+        self.resolution = resolution
+        self.bounds = bounds
+        self.shape = shape
+        self.crs = rasterio.crs.CRS.from_epsg(epsg)
+        self.transform = rasterio.transform.from_bounds(
+            *bounds, shape[1], shape[0])
+
+    def __repr__(self):
+        """Return string representation."""
+        return 'BAWSGrid(%i m, %ix%i)' % ((self.resolution, ) + self.shape)
+
+    @property
+    def name(self):
+        """Return name of the grid, eg. baws1000."""
+        return 'baws%i' % self.resolution
+
+    @property
+    def cell_area(self):
+        """Return area (m2) of one grid cell."""
+        return float(self.resolution ** 2)
+
+    @property
+    def size(self):
+        """Return number of cells."""
+        return self.shape[0] * self.shape[1]
+
+    def area2transform(self):
+        """Return crs, transform and shape of the grid."""
+        return self.crs, self.transform, self.shape
+
+    def area_to_pixels(self, area):
+        """Return the number of cells that corresponds to area (m2)."""
+        return area / self.cell_area
+
+    def zeros(self, dtype=np.uint8):
+        """Return zero array with the shape of the grid."""
+        return np.zeros(self.shape, dtype=dtype)
+
+    def ones(self, dtype=np.uint8):
+        """Return array filled with ones with the shape of the grid."""
+        return np.ones(self.shape, dtype=dtype)
+
+    def profile(self, template_path=None, **kwargs):
+        """Return rasterio meta data for writing rasters on the grid.
+
+        If the template raster matches the grid its meta data is used, so that
+        files keep looking the same as they always have.
+
+        Args:
+            template_path: Path to raster template.
+            **kwargs: Updates to the meta data, eg. compress='lzw'.
+        """
+        meta = None
+        if template_path:
+            with rasterio.open(template_path) as rst:
+                if rst.shape == self.shape and rst.transform == self.transform:
+                    meta = rst.meta.copy()
+        if meta is None:
+            meta = {
+                'driver': 'GTiff',
+                'dtype': 'uint8',
+                'nodata': None,
+                'width': self.shape[1],
+                'height': self.shape[0],
+                'count': 1,
+                'crs': self.crs,
+                'transform': self.transform,
+            }
+        meta.update(**kwargs)
+        return meta
+
+    def matches(self, rst):
+        """Return True if the opened raster is aligned with the grid."""
+        return rst.shape == self.shape and rst.transform == self.transform
+
+    def warp(self, array, src_transform, src_crs=None, dtype=None,
+             resampling=Resampling.nearest):
+        """Return array resampled onto the grid.
+
+        Used for rasters that only exists in one resolution
+        (districts, valid area mask, ..).
+
+        Args:
+            array: 2D source array.
+            src_transform: Affine transform of the source array.
+            src_crs: CRS of the source array (default: grid crs)
+            dtype: Output dtype (default: the dtype of array)
+            resampling: rasterio resampling method.
+        """
+        out = self.zeros(dtype=dtype or array.dtype)
+        reproject(
+            source=array, destination=out,
+            src_transform=src_transform, src_crs=src_crs or self.crs,
+            dst_transform=self.transform, dst_crs=self.crs,
+            resampling=resampling
+        )
+        return out
+
+    def read(self, path, band=1, resampling=Resampling.nearest, cache=True):
+        """Return band of raster, resampled onto the grid if needed.
+
+        The band is read through the raster cache, rasters on the grid are
+        returned as read only arrays.
+
+        Args:
+            path: Path to raster file.
+            band: Band number.
+            resampling: rasterio resampling method.
+            cache: If False the raster cache is bypassed (rasters that are
+                   only read once).
+        """
+        array = read_band(path, band=band, cache=cache)
+        with rasterio.open(path) as rst:
+            if self.matches(rst):
+                return array
+            return self.warp(array, rst.transform, src_crs=rst.crs,
+                             resampling=resampling)
+
+
+GRIDS = {
+    1000: BAWSGrid(
+        1000, (-49739.0, 5954123.0, 1350261.0, 7354123.0), (1400, 1400)),
+    300: BAWSGrid(
+        300, (-49739.0, 5954123.0, 1350361.0, 7354223.0), (4667, 4667)),
+}
+
+
+def get_grid(resolution=1000):
+    """Return BAWSGrid for the given resolution (1000 or 300 m).
+
+    Args:
+        resolution: Cell size in meters.
+    """
+    resolution = int(resolution)
+    if resolution not in GRIDS:
+        raise ValueError('No BAWS grid with resolution %s m. Choose between: '
+                         '%s' % (resolution, ', '.join(map(str, GRIDS))))
+    return GRIDS[resolution]
+
+
+def grid_from_shape(shape):
+    """Return BAWSGrid with the given array shape.
+
+    Args:
+        shape: (height, width)
+    """
+    for grid in GRIDS.values():
+        if grid.shape == tuple(shape):
+            return grid
+    raise ValueError('No BAWS grid with shape %s' % (shape, ))
@@ -21,15 +21,13 @@ from qgis.core import (
     QgsSingleBandPseudoColorRenderer
 )
 
-import os
-import shapely
 import descartes
-import rasterio as rio
-import numpy as np
 
 from .. import readers
 from .. import writers
 from .. import utils
+from .composite import CompositeStore, write_weekmap
+from .reproject import get_map_projection
 
 
 class BaseShapeHandler:
@@ -66,34 +64,38 @@ class BaseShapeHandler:
 
     def get_matplotlib_patches(self, map_obj, color_mapper=None,
                                attr_key='class'):
-        """"""
+        """Return list of color patches of the shapes in map coordinates.
+
+        All shapes are reprojected to the map projection in bulk (see
+        handlers.reproject), straight from the crs of the shape file.
+        """
         patches_dict = {value: [] for value in self.prioritized_values}
 
-        for poly, value in zip(self.shapes['geometry'], self.shapes[attr_key]):
+        crs = self.shapes.crs.to_string() if self.shapes.crs else 'EPSG:3006'
+        geometries = get_map_projection(map_obj, crs=crs).transform(
+            self.shapes['geometry'].values)
+
+        for mpoly, value in zip(geometries, self.shapes[attr_key]):
 
             if int(value) == 0:
                 # Dummy value '0' is regarded as a DUMMY value :)
                 continue
 
-            if poly.geom_type == 'Polygon':
-                mpoly = shapely.ops.transform(map_obj, poly)
+            if mpoly.geom_type == 'Polygon':
+                polygons = [mpoly]
+            elif mpoly.geom_type == 'MultiPolygon':
+                polygons = mpoly.geoms
+            else:
+                print('Not working......')
+                continue
+
+            for polygon in polygons:
                 patches_dict[value].append(descartes.PolygonPatch(
-                    mpoly,
+                    polygon,
                     lw=0.15,
                     ec=color_mapper[value],
                     color=color_mapper[value])
                 )
-            elif poly.geom_type == 'MultiPolygon':
-                for subpoly in poly:
-                    mpoly = shapely.ops.transform(map_obj, subpoly)
-                    patches_dict[value].append(descartes.PolygonPatch(
-                        mpoly,
-                        lw=0.15,
-                        ec=color_mapper[value],
-                        color=color_mapper[value])
-                    )
-            else:
-                print('Not working......')
 
         patches_list = []
         # Extend patches_list accoring to backward class priority.
@@ -168,6 +170,7 @@ class LayerHandler:
         self.iface = iface
         self.settings = settings
         self.number_of_layers_merged = None
+        self.composite_store = CompositeStore()
 
     @property
     def active_cyano_tiff_layers(self):
@@ -497,7 +500,7 @@ class LayerHandler:
                             'self.active_layer is None')
         return layer
 
-    def save_shapefile(self, layer_name=None, path='', output_prefix=''):
+    def save_shapefile(self, layer_name=None, path=''):
         """"""
         layer = self.get_output_layer(layer_name=layer_name)
 
@@ -509,17 +512,6 @@ class LayerHandler:
         writers.shape_writer('qgis', layer, path, "utf-8",
                              driverName="ESRI Shapefile")
 
-        self.files_ready_check(utils.generate_filepaths,
-                               os.path.dirname(path),
-                               pattern=output_prefix)
-
-    @staticmethod
-    def files_ready_check(generator_func, path, pattern=''):
-        """"""
-        print('Sleeping while files are being saved..')
-        file_paths = generator_func(path, pattern=pattern, only_from_dir=True)
-        utils.sleep_while_saving(file_paths)
-
     def get_output_path_for_shape(self, prefix, outpath=None, suffix='.shp'):
         """"""
         if not outpath:
@@ -566,41 +558,23 @@ class LayerHandler:
         return [files[0::2], files[1::2]]
 
     def create_7day_composite(self):
-        """"""
+        """Create the weekmap raster (number of bloom days per pixel).
+
+        The composite store keeps the daily bloom masks of the session, so
+        only days that are new to the window (or re-saved) are read.
+        """
         # TODO Move to RasterHandler
         print('\nCreating 7day composite..')
-        file_generator = self.select_files_for_composite()
-        zeros = np.array(())
-        week_bloom = None
-        raster_meta = None
-        for fid in file_generator:
-            print('Adding {} to composite file selection'.format(
-                os.path.basename(fid)))
-            rst = rio.open(fid)
-            array = rst.read()
-            array = array[0]
-
-            if not zeros.size:
-                # First iteration of loop: We resets "zeros" to the shape of "array" and extract raster metadata
-                # (used for creation of new tiff-file)
-                zeros = np.zeros(array.shape)
-                week_bloom = np.zeros(zeros.shape)
-                raster_meta = rst.meta.copy()
-
-            day_bloom = np.where(np.logical_or(array == 2, array == 3), 1,
-                                 zeros)
-
-            week_bloom = week_bloom + day_bloom
-
-        week_bloom = week_bloom.astype(np.uint8)
-
-        raster_meta.update(compress='lzw')
-        fid_rst_week = fid.replace('_daymap_', '_weekmap_')
-        print('writing to {}'.format(fid_rst_week))
-        with rio.open(fid_rst_week, 'w+', **raster_meta) as out:
-            out.write(week_bloom, 1)
-        out.close()
-
+        files = self.select_files_for_composite()
+        nr_reads = self.composite_store.nr_reads
+        week_bloom = self.composite_store.update(files).copy()
+        print('{} of {} daymaps read from file'.format(
+            self.composite_store.nr_reads - nr_reads, len(files)))
+
+        fid_rst_week = write_weekmap(
+            week_bloom, self.composite_store.meta,
+            files[-1].replace('_daymap_', '_weekmap_')
+        )
         return week_bloom, fid_rst_week
 
     def select_files_for_composite(self):
@@ -4,6 +4,8 @@ Created on 2019-05-22 12:33
 
 @author: a002028
 """
+import os
+from pathlib import Path
 import pickle
 import matplotlib.pyplot as plt
 from matplotlib.collections import PatchCollection
@@ -11,6 +13,24 @@ import matplotlib.cbook as cbook
 
 from mpl_toolkits.basemap import Basemap
 
+from .map_cache import DPI, MapLayers, file_digest
+from .map_raster import render_raster
+
+
+RESOURCES = Path(__file__).parents[1].joinpath('resources')
+
+# Logo and legend (path, axes settings) of the maps.
+PICTURES = {
+    'day': [
+        (RESOURCES.joinpath('smhi-logo.png'), [0.835, 0.86, 0.1, 0.12]),
+        (RESOURCES.joinpath('daily_legend.png'), [0.74, 0.056, 0.2, 0.2]),
+    ],
+    'week': [
+        (RESOURCES.joinpath('smhi-logo.png'), [0.835, 0.86, 0.1, 0.12]),
+        (RESOURCES.joinpath('weekly_legend.png'), [0.728, 0.057, 0.3, 0.3]),
+    ],
+}
+
 
 def get_basemap(map_axes):
     """Return standard map object.
@@ -38,13 +58,23 @@ def get_basemap(map_axes):
 class MapHandler:
     """"""
 
-    def __init__(self, path_figure=None, path_basemap=None):
+    def __init__(self, path_figure=None, path_basemap=None,
+                 cache_directory=None, render_mode='raster'):
         """Initialize.
 
         self.map_obj is used to transform polygon coordinates to the
         map projection.
+
+        With a cache_directory the figures are not unpickled for every
+        session, the basemaps are pre-rendered once (see MapLayers) and
+        self.day_layers / self.week_layers are used instead. The blooms are
+        then drawn from the class rasters (render_mode 'raster') or as
+        polygon patches ('patches', vector quality).
         """
         self.path_figure = path_figure
+        self.path_basemap = path_basemap
+        self.cache_directory = cache_directory
+        self.render_mode = render_mode
         with open(path_basemap, 'rb') as f:
             self.map_obj = pickle.load(f)
         self.week_map = None
@@ -53,6 +83,8 @@ class MapHandler:
         self.day_map = None
         self.day_axes = None
         self.day_figure = None
+        self.day_layers = None
+        self.week_layers = None
 
         self.day_colormap_properties = {
             0: '#000000',  # dummy color
@@ -79,6 +111,11 @@ class MapHandler:
         Takes around 15 seconds per map,
         hence the threading might be a good idea.
         """
+        if self.cache_directory:
+            self.day_layers = self.get_map_layers('day')
+            self.week_layers = self.get_map_layers('week')
+            return
+
         with open(self.path_figure, 'rb') as openfile:
             self.day_figure = pickle.load(openfile)
         self.day_axes = self.day_figure.axes[0]
@@ -87,6 +124,85 @@ class MapHandler:
             self.week_figure = pickle.load(openfile)
         self.week_axes = self.week_figure.axes[0]
 
+    def get_map_layers(self, name):
+        """Return MapLayers of the day or week map.
+
+        The layers are cached in self.cache_directory, keyed by the content
+        of the figure / basemap files and the pictures.
+
+        Args:
+            name: 'day' or 'week'.
+        """
+        pictures = PICTURES[name]
+        key = file_digest(
+            [self.path_figure, self.path_basemap]
+            + [path for path, _ in pictures],
+            [axes_settings for _, axes_settings in pictures], DPI
+        )
+        cache_path = os.path.join(self.cache_directory,
+                                  'basemap_%s_%s.npz' % (name, key))
+        if os.path.isfile(cache_path):
+            return MapLayers.load(cache_path)
+
+        with open(self.path_figure, 'rb') as openfile:
+            figure = pickle.load(openfile)
+        self.add_pictures(figure, name)
+        layers = MapLayers.from_figure(figure, map_axes=figure.axes[0])
+        plt.close(figure)
+        layers.save(cache_path)
+        return layers
+
+    def add_pictures(self, figure, name):
+        """Add logo and legend of the day or week map to figure."""
+        for path, axes_settings in PICTURES[name]:
+            self.add_picture_to_figure(figure, path_picture=str(path),
+                                       axes_settings=axes_settings)
+
+    def uses_raster(self, name, file_path):
+        """Return True if the map of file_path is drawn from its raster.
+
+        Args:
+            name: 'day' or 'week'.
+            file_path: Path to the daymap / weekmap shapefile.
+        """
+        return bool(getattr(self, '%s_layers' % name)
+                    and self.render_mode == 'raster'
+                    and os.path.isfile(os.path.splitext(file_path)[0]
+                                       + '.tiff'))
+
+    def save_png_map(self, name, file_path, shape_handler=None):
+        """Save the day or week PNG-map of file_path.
+
+        With pre-rendered basemaps the blooms are drawn from the raster next
+        to the shapefile (see uses_raster), otherwise as patches.
+
+        Args:
+            name: 'day' or 'week'.
+            file_path: Path to the daymap / weekmap shapefile.
+            shape_handler: DailyShapeHandler or WeeklyShapeHandler with the
+                           shapes read (not needed if uses_raster).
+        """
+        colormap_properties = getattr(self, '%s_colormap_properties' % name)
+        layers = getattr(self, '%s_layers' % name)
+        png_path = file_path.replace('.shp', '.png')
+        if self.uses_raster(name, file_path):
+            self.save_raster_map(png_path, layers,
+                                 os.path.splitext(file_path)[0] + '.tiff',
+                                 colormap_properties)
+            return png_path
+
+        patches = shape_handler.get_matplotlib_patches(self.map_obj,
+                                                       colormap_properties)
+        if layers:
+            self.save_map(png_path, layers, patches)
+        else:
+            figure = getattr(self, '%s_figure' % name)
+            self.add_pictures(figure, name)
+            self.plot_patches(patches,
+                              map_axes=getattr(self, '%s_axes' % name))
+            self.save_figure(png_path, figure)
+        return png_path
+
     @staticmethod
     def add_picture_to_figure(figure, path_picture='',
                               axes_settings=None):
@@ -129,4 +245,28 @@ class MapHandler:
             left=0.001
         )
         """
-        figure.savefig(path, dpi=287)
+        figure.savefig(path, dpi=DPI)
+
+    @staticmethod
+    def save_map(path, layers, patches):
+        """Save map with patches on top of the pre-rendered basemap.
+
+        Args:
+            path: Path to the PNG file.
+            layers: MapLayers.
+            patches: Color patches of the bloom layer.
+        """
+        layers.save_png(path, layer=layers.render_patches(patches))
+
+    def save_raster_map(self, path, layers, raster_path,
+                        colormap_properties):
+        """Save map with the class raster on top of the pre-rendered basemap.
+
+        Args:
+            path: Path to the PNG file.
+            layers: MapLayers.
+            raster_path: Path to the daymap / weekmap raster.
+            colormap_properties: {value: color}.
+        """
+        layers.save_png(path, layer=render_raster(
+            layers, self.map_obj, raster_path, colormap_properties))
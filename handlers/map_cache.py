@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 21:40
+
+@author: a002028
+
+Pre-rendered basemaps for the PNG maps.
+
+The map figure (coastlines, land, logo and legend) is rendered once into two
+RGBA arrays: everything below the bloom layer and everything on top of it
+(land is drawn on top of the blooms). A map is then made by rendering only
+the bloom layer in an empty figure with the same axes and stacking the three
+arrays.
+"""
+import os
+import hashlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+import matplotlib.image as mpimg
+
+
+# Resolution of the PNG maps, see MapHandler.save_figure.
+DPI = 287
+
+# Artists with a higher zorder than the bloom layer (PatchCollection default)
+# are drawn on top of it.
+LAYER_ZORDER = 1
+
+
+def file_digest(paths, *extra):
+    """Return sha1 hex digest of the content of the files and extra values.
+
+    Args:
+        paths: Iterable of file paths.
+        extra: Other values the result depends on, eg. the dpi.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    digest.update(repr(extra).encode())
+    return digest.hexdigest()
+
+
+def render_rgba(figure, dpi=DPI):
+    """Return figure rendered at dpi as RGBA array (height, width, 4)."""
+    old_dpi = figure.dpi
+    figure.set_dpi(dpi)
+    try:
+        canvas = FigureCanvasAgg(figure)
+        canvas.draw()
+        return np.array(canvas.buffer_rgba())
+    finally:
+        figure.set_dpi(old_dpi)
+
+
+def composite(background, *layers):
+    """Return layers stacked on the (opaque) background, RGBA uint8.
+
+    Only the pixels a layer covers are blended, most of the map is either
+    empty or fully covered.
+
+    Args:
+        background: RGBA array.
+        layers: RGBA arrays (straight alpha) of the same shape.
+    """
+    out = background.copy()
+    out[..., 3] = 255
+    for layer in layers:
+        alpha = layer[..., 3]
+        opaque = alpha == 255
+        out[opaque] = layer[opaque]
+        partial = np.logical_and(alpha > 0, ~opaque)
+        rgb = out[partial, :3].astype(np.float32)
+        rgb += (layer[partial, :3] - rgb) * (
+            alpha[partial, None].astype(np.float32) / 255)
+        out[partial, :3] = np.rint(rgb)
+    return out
+
+
+class MapLayers:
+    """Pre-rendered basemap below and above the bloom layer of one map."""
+
+    def __init__(self, below, above, position, xlim, ylim, size_inches,
+                 dpi=DPI):
+        """Initialize.
+
+        Args:
+            below: RGBA array, the map below the bloom layer.
+            above: RGBA array, the map above the bloom layer.
+            position: Position of the map axes in the figure
+                      (left, bottom, width, height).
+            xlim: x limits of the map axes (map projection coordinates).
+            ylim: y limits of the map axes.
+            size_inches: Figure size.
+            dpi: Resolution of the arrays.
+        """
+        self.below = below
+        self.above = above
+        self.position = tuple(position)
+        self.xlim = tuple(xlim)
+        self.ylim = tuple(ylim)
+        self.size_inches = tuple(size_inches)
+        self.dpi = dpi
+
+    @classmethod
+    def from_figure(cls, figure, map_axes=None, dpi=DPI,
+                    zorder=LAYER_ZORDER):
+        """Render figure into MapLayers.
+
+        Args:
+            figure: The map figure, with logo and legend added.
+            map_axes: The axes the blooms are drawn in (default: the first).
+            dpi: Resolution.
+            zorder: zorder of the bloom layer.
+        """
+        map_axes = map_axes or figure.axes[0]
+        children = [a for a in map_axes.get_children()
+                    if a is not map_axes.patch]
+        others = [ax for ax in figure.axes if ax is not map_axes]
+        artists = children + others + [map_axes.patch, figure.patch]
+        visible = {artist: artist.get_visible() for artist in artists}
+        try:
+            for artist in children:
+                artist.set_visible(visible[artist]
+                                   and artist.get_zorder() <= zorder)
+            for ax in others:
+                ax.set_visible(False)
+            below = render_rgba(figure, dpi=dpi)
+
+            for artist in children:
+                artist.set_visible(visible[artist]
+                                   and artist.get_zorder() > zorder)
+            for ax in others:
+                ax.set_visible(visible[ax])
+            map_axes.patch.set_visible(False)
+            figure.patch.set_visible(False)
+            above = render_rgba(figure, dpi=dpi)
+        finally:
+            for artist, value in visible.items():
+                artist.set_visible(value)
+        return cls(below, above, map_axes.get_position().bounds,
+                   map_axes.get_xlim(), map_axes.get_ylim(),
+                   figure.get_size_inches(), dpi=dpi)
+
+    @classmethod
+    def load(cls, path):
+        """Return MapLayers saved with save."""
+        with np.load(path) as data:
+            return cls(data['below'], data['above'], data['position'],
+                       data['xlim'], data['ylim'], data['size_inches'],
+                       dpi=float(data['dpi']))
+
+    def save(self, path):
+        """Save layers to .npz file (written next to path, then moved)."""
+        tmp_path = '%s.%i.tmp.npz' % (os.path.splitext(path)[0], os.getpid())
+        np.savez(tmp_path, below=self.below, above=self.above,
+                 position=self.position, xlim=self.xlim, ylim=self.ylim,
+                 size_inches=self.size_inches, dpi=self.dpi)
+        os.replace(tmp_path, path)
+        return path
+
+    def layer_figure(self):
+        """Return (figure, axes), transparent and with the map axes."""
+        figure = Figure(figsize=self.size_inches, dpi=self.dpi)
+        figure.patch.set_visible(False)
+        axes = figure.add_axes(self.position)
+        axes.set_xlim(self.xlim)
+        axes.set_ylim(self.ylim)
+        axes.axis('off')
+        return figure, axes
+
+    def render_patches(self, patches):
+        """Return RGBA array of the bloom layer with patches."""
+        figure, axes = self.layer_figure()
+        if any(patches):
+            axes.add_collection(PatchCollection(patches, match_original=True))
+        return render_rgba(figure, dpi=self.dpi)
+
+    def save_png(self, path, layer=None):
+        """Save the map with the bloom layer on top of the basemap.
+
+        Args:
+            path: Path to the PNG file.
+            layer: RGBA array of the bloom layer (default: no blooms).
+        """
+        layers = [self.above] if layer is None else [layer, self.above]
+        mpimg.imsave(path, composite(self.below, *layers), dpi=self.dpi)
+        return path
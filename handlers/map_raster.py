@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 22:15
+
+@author: a002028
+
+Bloom layer of the PNG maps drawn from the class raster.
+
+Every image pixel of the map axes gets the index of the raster cell it falls
+in (the warp grid, computed once per map and raster grid). The class raster
+is then put on the map with one lookup and one imshow call, instead of one
+PolygonPatch per polygon.
+"""
+from functools import lru_cache
+import numpy as np
+import rasterio
+from rasterio.transform import rowcol
+from rasterio.warp import transform as transform_coords
+from matplotlib.colors import to_rgba_array
+
+from .map_cache import render_rgba
+from .raster_cache import read_band
+
+
+def image_shape(layers):
+    """Return (rows, cols) of the map axes in the rendered image."""
+    left, bottom, width, height = layers.position
+    return (int(round(height * layers.size_inches[1] * layers.dpi)),
+            int(round(width * layers.size_inches[0] * layers.dpi)))
+
+
+@lru_cache(maxsize=4)
+def get_warp_index(map_obj, extent, shape, crs, transform, raster_shape):
+    """Return flat raster cell index of each image pixel (-1: outside).
+
+    Args:
+        map_obj: Map projection, map_obj(x, y, inverse=True) gives lon, lat.
+        extent: (x0, x1, y0, y1) of the map axes in map coordinates.
+        shape: (rows, cols) of the image.
+        crs: CRS (string) of the raster.
+        transform: Affine transform of the raster.
+        raster_shape: (rows, cols) of the raster.
+    """
+    x0, x1, y0, y1 = extent
+    dx = (x1 - x0) / shape[1]
+    dy = (y1 - y0) / shape[0]
+    # Pixel centres, first image row at the top of the map.
+    xs = x0 + dx * (np.arange(shape[1]) + 0.5)
+    ys = y1 - dy * (np.arange(shape[0]) + 0.5)
+    xx, yy = np.meshgrid(xs, ys)
+    lons, lats = map_obj(xx.ravel(), yy.ravel(), inverse=True)
+    gx, gy = transform_coords('EPSG:4326', crs, np.asarray(lons),
+                              np.asarray(lats))
+    rows, cols = rowcol(transform, gx, gy, op=np.floor)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    inside = ((rows >= 0) & (rows < raster_shape[0])
+              & (cols >= 0) & (cols < raster_shape[1]))
+    index = np.where(inside, rows * raster_shape[1] + cols, -1)
+    return index.reshape(shape)
+
+
+def color_table(colormap_properties, nr_values=256):
+    """Return RGBA lookup table (uint8) of class values, 0 is transparent.
+
+    Args:
+        colormap_properties: {value: color}, eg.
+                             MapHandler.day_colormap_properties.
+        nr_values: Size of the table.
+    """
+    table = np.zeros((nr_values, 4), dtype=np.uint8)
+    for value, color in colormap_properties.items():
+        if value:
+            table[value] = np.rint(to_rgba_array(color)[0] * 255)
+    return table
+
+
+def render_raster(layers, map_obj, raster_path, colormap_properties):
+    """Return RGBA array of the bloom layer drawn from a class raster.
+
+    Args:
+        layers: MapLayers of the map.
+        map_obj: Map projection.
+        raster_path: Path to the class (daymap) or count (weekmap) raster.
+        colormap_properties: {value: color}.
+    """
+    array = read_band(raster_path)
+    with rasterio.open(raster_path) as rst:
+        crs = rst.crs.to_string()
+        transform = rst.transform
+    index = get_warp_index(map_obj, layers.xlim + layers.ylim,
+                           image_shape(layers), crs, transform, array.shape)
+    # Index -1 (outside the raster) gets the transparent last row.
+    table = np.vstack([color_table(colormap_properties),
+                       np.zeros((1, 4), dtype=np.uint8)])
+    values = np.where(index >= 0, array.ravel()[index], len(table) - 1)
+    image = table[values]
+
+    figure, axes = layers.layer_figure()
+    axes.imshow(image, extent=layers.xlim + layers.ylim, origin='upper',
+                interpolation='nearest', aspect='auto')
+    return render_rgba(figure, dpi=layers.dpi)
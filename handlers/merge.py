@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 09:12
+
+@author: a002028
+"""
+import numpy as np
+
+
+# Class values covered by the lookup table. BAWS scenes use 0-4, the table
+# is a bit larger so that we never index outside of it with valid data.
+N_CLASSES = 8
+
+
+def merge_rules(daily_array, scene):
+    """Return the merge of daily_array and scene using the BAWS class rules.
+
+    This is the reference implementation of the class priority rules, it is
+    used to build the lookup table of SceneMerger.
+
+        0: no bloom (clear water) replaces cloud (1)
+        4: no data is replaced by whatever the new scene says
+        2: subsurface bloom replaces everything except surface bloom (3)
+        3: surface bloom always wins
+
+    Args:
+        daily_array: Merged array so far.
+        scene: Array of the incoming scene.
+    """
+    daily_array = np.where(
+        np.logical_and(daily_array == 1, scene == 0), 0, daily_array
+    )
+    daily_array = np.where(daily_array == 4, scene, daily_array)
+    daily_array = np.where(
+        np.logical_and(daily_array != 3, scene == 2), 2, daily_array
+    )
+    return np.where(scene == 3, 3, daily_array)
+
+
+def build_merge_table(n_classes=N_CLASSES):
+    """Return lookup table indexed by (current, incoming) class value."""
+    current, incoming = np.meshgrid(np.arange(n_classes),
+                                    np.arange(n_classes), indexing='ij')
+    return merge_rules(current, incoming).astype(np.uint8)
+
+
+MERGE_TABLE = build_merge_table()
+
+
+class SceneMerger:
+    """Fold scenes into one daily class array.
+
+    All rules are precomputed in MERGE_TABLE, so each scene is merged with a
+    single table lookup that writes into the daily array in place.
+
+    Example:
+        merger = SceneMerger()
+        for array in scenes:
+            merger.add(array)
+        daily_array = merger.array
+    """
+
+    _shift = int(np.log2(N_CLASSES))
+
+    def __init__(self):
+        """Initialize."""
+        self.array = None
+        self._index = None
+        self._table = MERGE_TABLE.ravel()
+
+    @staticmethod
+    def _as_class_array(array):
+        """Return array as uint8, raise if values falls outside the table."""
+        array = np.asarray(array)
+        if array.size and (array.min() < 0 or array.max() >= N_CLASSES):
+            raise ValueError(
+                'Class values must be in range 0-%i, got %s - %s'
+                % (N_CLASSES - 1, array.min(), array.max())
+            )
+        return array.astype(np.uint8, copy=False)
+
+    def add(self, scene):
+        """Merge scene into the daily array.
+
+        Args:
+            scene: 2D array of class values (0-4).
+        """
+        scene = self._as_class_array(scene)
+        if self.array is None:
+            self.array = scene.copy()
+            self._index = np.empty_like(self.array)
+            return
+
+        if scene.shape != self.array.shape:
+            raise ValueError('Scene shape %s does not match the daily array '
+                             'shape %s' % (scene.shape, self.array.shape))
+
+        np.left_shift(self.array, self._shift, out=self._index)
+        np.bitwise_or(self._index, scene, out=self._index)
+        np.take(self._table, self._index, out=self.array, mode='clip')
+
+    def merge(self, scenes):
+        """Merge all scenes and return the daily array.
+
+        Args:
+            scenes: Iterable of 2D class arrays.
+        """
+        for scene in scenes:
+            self.add(scene)
+        return self.array
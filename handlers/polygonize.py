@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 18:20
+
+@author: a002028
+
+Polygonization of class rasters.
+
+Each class group gets its own boolean mask, so rasterio.features.shapes only
+traces the regions we want to keep. The polygons are built in bulk with
+shapely (one linearrings/polygons call per group) and returned as a
+GeoDataFrame with a "class" column.
+"""
+import os
+import numpy as np
+import shapely
+import fiona
+import geopandas as gpd
+from rasterio.features import shapes
+
+from ..subprocesses.pool import get_process_pool
+from .grid import grid_from_shape
+
+
+SCHEMA = {'properties': [('class', 'int')], 'geometry': 'Polygon'}
+
+
+def class_groups(array, exclude=(0, )):
+    """Return one group per class value present in array.
+
+    Args:
+        array: Class or count array (unsigned integers).
+        exclude: Values to skip (default: 0, no class).
+    """
+    counts = np.bincount(array.ravel())
+    return [(int(v), ) for v in np.flatnonzero(counts) if v not in exclude]
+
+
+def class_mask(array, classes, mask=None):
+    """Return boolean array, True where array has one of the classes.
+
+    Args:
+        array: Class array.
+        classes: Iterable of class values.
+        mask: Optional array, only cells where mask is not 0 are kept.
+    """
+    group_mask = np.isin(array, classes)
+    if mask is not None:
+        np.logical_and(group_mask, mask, out=group_mask)
+    return group_mask
+
+
+def trace_polygons(array, classes, transform, mask=None):
+    """Return (polygons, values) of the regions with a value in classes.
+
+    Args:
+        array: Class array.
+        classes: Iterable of class values.
+        transform: Affine transform of the array.
+        mask: Optional array, only cells where mask is not 0 are traced.
+    """
+    group_mask = class_mask(array, classes, mask=mask)
+    if not group_mask.any():
+        return np.empty(0, dtype=object), np.empty(0, dtype=np.int64)
+
+    coords = []
+    ring_sizes = []
+    ring_polygons = []
+    values = []
+    for i, (geom, value) in enumerate(
+            shapes(array, mask=group_mask, transform=transform)):
+        for ring in geom['coordinates']:
+            coords.extend(ring)
+            ring_sizes.append(len(ring))
+            ring_polygons.append(i)
+        values.append(value)
+
+    rings = shapely.linearrings(
+        np.array(coords, dtype=np.float64),
+        indices=np.repeat(np.arange(len(ring_sizes)), ring_sizes)
+    )
+    polygons = shapely.polygons(rings, indices=np.array(ring_polygons))
+    return polygons, np.array(values, dtype=np.int64)
+
+
+def trace_wkb(array, classes, transform, mask=None):
+    """Return (WKB array, values), see trace_polygons. Used by the workers."""
+    polygons, values = trace_polygons(array, classes, transform, mask=mask)
+    return shapely.to_wkb(polygons), values
+
+
+def polygonize(array, grid=None, groups=None, mask=None, parallel=False):
+    """Return GeoDataFrame with the polygons of the class groups.
+
+    The polygons come in the order of the groups, eg. groups=[(2, 3), (1, 4)]
+    gives blooms first with clouds and missing data on top.
+
+    Args:
+        array: Class or count array.
+        grid: BAWSGrid of the array (default: found from the array shape).
+        groups: List of class groups, eg. [(1, ), (2, 3)] (default: one
+                group per non-zero value in the array).
+        mask: Optional array, only cells where mask is not 0 are traced.
+        parallel: If True the groups are traced in worker processes. Off
+                  by default, it did not pay off in
+                  test/benchmark_polygonize.py (see the results there).
+    """
+    grid = grid or grid_from_shape(array.shape)
+    groups = class_groups(array) if groups is None else list(groups)
+    if parallel:
+        pool = get_process_pool(name='polygonize',
+                                max_workers=min(len(groups),
+                                                os.cpu_count() or 1))
+        futures = [pool.submit(trace_wkb, array, group, grid.transform,
+                               mask=mask) for group in groups]
+        results = []
+        for future in futures:
+            wkb, values = future.result()
+            results.append((shapely.from_wkb(wkb), values))
+    else:
+        results = [trace_polygons(array, group, grid.transform, mask=mask)
+                   for group in groups]
+
+    if results:
+        polygons = np.concatenate([r[0] for r in results])
+        values = np.concatenate([r[1] for r in results])
+    else:
+        polygons = np.empty(0, dtype=object)
+        values = np.empty(0, dtype=np.int64)
+    return gpd.GeoDataFrame(
+        {'class': values},
+        geometry=gpd.GeoSeries(polygons, crs=grid.crs.to_string())
+    )
+
+
+def write_shapefile(gdf, path):
+    """Write polygons (GeoDataFrame with a "class" column) to shapefile.
+
+    Args:
+        gdf: GeoDataFrame, eg. from polygonize.
+        path: Path to the shapefile.
+    """
+    if len(gdf):
+        gdf.to_file(path, driver='ESRI Shapefile')
+    else:
+        # An empty shapefile still needs the polygon schema.
+        with fiona.open(path, 'w', driver='ESRI Shapefile',
+                        crs_wkt=gdf.crs.to_wkt(), schema=SCHEMA):
+            pass
+    return path
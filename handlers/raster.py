@@ -6,55 +6,110 @@ Created on 2020-05-13 16:39
 
 """
 import os
+import tracemalloc
 import numpy as np
 import fiona
-from fiona.crs import to_string
-from shapely.geometry import MultiPolygon, mapping, shape
-from shapely.ops import polygonize
+import pandas as pd
 import rasterio
 from rasterio import features
-from rasterio.features import shapes, rasterize
+from rasterio.features import rasterize
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import Resampling
 from .. import utils
+from .area_filter import remove_small_areas
+from .geometry import repair_geometries
+from .grid import get_grid, grid_from_shape
+from .merge import SceneMerger
+from .polygonize import polygonize, write_shapefile
+from . import raster_cache
+from .raster_cache import read_band
+from .raster_profile import PRODUCT_COMPRESSION, write_raster
+
+
+# Class rasters (values 0-4) and count rasters (weekmap, values 0-7) are kept
+# in this dtype from read through write.
+CLASS_DTYPE = np.uint8
+COUNT_DTYPE = np.uint8
+
+
+def check_class_array(array, dtype=CLASS_DTYPE):
+    """Return array if it is of the expected compact dtype, otherwise raise.
+
+    Args:
+        array: numpy array.
+        dtype: Expected dtype.
+    """
+    if array.dtype != dtype:
+        raise TypeError('Expected raster array of dtype %s, got %s'
+                        % (np.dtype(dtype).name, array.dtype.name))
+    return array
+
+
+def as_class_array(array, dtype=CLASS_DTYPE):
+    """Return array in the compact dtype.
+
+    Raises if the values does not fit, e.g. negative or float values.
+
+    Args:
+        array: numpy array.
+        dtype: Target dtype.
+    """
+    if array.dtype == dtype:
+        return array
+    info = np.iinfo(dtype)
+    if not np.issubdtype(array.dtype, np.integer) or (
+            array.size and (array.min() < info.min or array.max() > info.max)):
+        raise TypeError('Raster array of dtype %s can not be stored as %s'
+                        % (array.dtype.name, np.dtype(dtype).name))
+    return array.astype(dtype)
+
+
+def read_class_raster(path, band=1, dtype=CLASS_DTYPE, cache=True):
+    """Return band of raster file as a compact class array.
+
+    The array is read only when it comes from the raster cache.
+
+    Args:
+        path: Path to raster file.
+        band: Band number.
+        dtype: Target dtype.
+        cache: If False the raster cache is bypassed.
+    """
+    return as_class_array(read_band(path, band=band, cache=cache),
+                          dtype=dtype)
 
 
 def area2transform_baws1000_sweref99tm():
-    crs = rasterio.crs.CRS.from_string('epsg:3006')
-    west, south, east, north = (-49739.0, 5954123.0, 1350261.0, 7354123.0)
-    height, width = (1400, 1400)
-    transform = rasterio.transform.from_bounds(west, south,
-                                               east, north,
-                                               width, height)
-    return crs, transform, (height, width)
+    return get_grid(1000).area2transform()
 
 
 def area2transform_baws300_sweref99tm():
-    crs = rasterio.crs.CRS.from_string('+init=epsg:3006')
-    west, south, east, north = (-49739.0, 5954123.0, 1350361.0, 7354223.0)
-    height, width = (4667, 4667)
-    transform = rasterio.transform.from_bounds(west, south,
-                                               east, north,
-                                               width, height)
-    return crs, transform, (height, width)
+    return get_grid(300).area2transform()
 
 
 class RasterHandler:
     """"""
 
-    def __init__(self, raster_template_path=None):
+    def __init__(self, raster_template_path=None, grid=None):
         """Initialize.
 
         Args:
-            raster_template_path:
+            raster_template_path: Path to raster template. Only used if it
+                                  matches the grid.
+            grid: BAWSGrid to work on (default: the 1000 m grid).
         """
+        self.grid = grid or get_grid(1000)
         try:
-            assert type(raster_template_path) == str
-            rst = rasterio.open(raster_template_path)
-            self.raster_meta = rst.meta.copy()
-            self.raster_meta.update(compress='lzw')
-        except:
-            pass
+            self.raster_meta = self.grid.profile(
+                template_path=str(raster_template_path)
+                if raster_template_path else None,
+                compress='lzw'
+            )
+        except rasterio.errors.RasterioIOError:
+            self.raster_meta = self.grid.profile(compress='lzw')
         self.save_path = None
         self.shapes = None
+        self.merge_peak_memory = None
 
     def rasterize(self, cyano_file_path, save_path=None):
         """"""
@@ -70,35 +125,35 @@ class RasterHandler:
         shapes = []
         for c in (4, 2, 3, 1):
             shapes.extend(classes[c])
-        with rasterio.open(save_path, 'w+', **self.raster_meta) as out:
-            out_arr = out.read(1)
-            burned = features.rasterize(shapes=shapes, fill=0, out=out_arr,
-                                        transform=out.transform)
-            out.write_band(1, burned)
+        out_arr = self.grid.zeros(dtype=CLASS_DTYPE)
+        if shapes:
+            features.rasterize(shapes=shapes, fill=0, out=out_arr,
+                               transform=self.raster_meta['transform'])
+        write_raster(save_path, out_arr, self.raster_meta,
+                     compression=PRODUCT_COMPRESSION['daymap'])
 
     def shapeify(self, array, weekday_rst_path):
         """"""
         print('get_shapes_from_raster')
-        shape_list = self.get_shapes_from_raster(array, None)
-
-        fname = weekday_rst_path.replace('.tiff', '.shp')
-        schema = {'properties': [('class', 'int')], 'geometry': 'Polygon'}
-
-        crs, _, _ = area2transform_baws1000_sweref99tm()
-
-        with fiona.open(fname, 'w', driver='ESRI Shapefile',
-                        crs=to_string(crs), schema=schema) as dst:
-            dst.writerecords(shape_list)
+        check_class_array(array, dtype=COUNT_DTYPE)
+        polygons = self.get_shapes_from_raster(array, None)
+        write_shapefile(polygons, weekday_rst_path.replace('.tiff', '.shp'))
         print('shapeify completed!')
 
     @staticmethod
-    def get_shapes_from_raster(raster, mask_file, daymaps=False):
-        """"""
-        shapes_with_properties = []
-        _, transform, area_shape = area2transform_baws1000_sweref99tm()
+    def get_shapes_from_raster(raster, mask_file, daymaps=False, grid=None):
+        """Return GeoDataFrame with the polygons (and "class") of raster.
 
-        classes = {int(cls): {'class': int(cls)} for cls in np.unique(raster)}
-        classes[0] = None
+        Args:
+            raster: Class or count array.
+            mask_file: Optional shapefile, only areas within it are traced.
+            daymaps: If True only blooms are traced within the mask, with
+                     clouds and missing data on top (None is returned if
+                     the mask area is not covered by any scene).
+            grid: BAWSGrid of the array.
+        """
+        grid = grid or grid_from_shape(raster.shape)
+        _, transform, area_shape = grid.area2transform()
 
         if mask_file:
             with fiona.open(mask_file, "r") as shapefile:
@@ -107,33 +162,18 @@ class RasterHandler:
         else:
             mask = None
 
-        blooms = {0, 2, 3}
-        others = {0, 1, 4}
         if daymaps:
-            covered = False
-            for s, v in shapes(raster, mask=mask, transform=transform):
-                if v != 4:
-                    covered = True
-                if v in others:
-                    continue
-                shapes_with_properties.append({'properties': classes[int(v)],
-                                               'geometry': s})
-            if not covered:
+            covered = raster != 4 if mask is None else np.logical_and(
+                raster != 4, mask != 0)
+            if not covered.any():
                 return None
-
             # Clouds ontop!
-            for s, v in shapes(raster, transform=transform):
-                if v in blooms:
-                    continue
-                shapes_with_properties.append({'properties': classes[int(v)],
-                                               'geometry': s})
-        else:
-            for s, v in shapes(raster, mask=mask, transform=transform):
-                if v == 0:
-                    continue
-                shapes_with_properties.append({'properties': classes[int(v)],
-                                               'geometry': s})
-        return shapes_with_properties
+            return pd.concat([
+                polygonize(raster, grid=grid, groups=[(2, ), (3, )],
+                           mask=mask),
+                polygonize(raster, grid=grid, groups=[(1, ), (4, )])
+            ], ignore_index=True)
+        return polygonize(raster, grid=grid, mask=mask)
 
     def merge_scene_shapes(self, layer_names=None, output_filename=None,
                            mask_path=None):
@@ -142,133 +182,133 @@ class RasterHandler:
 
         if mask_path:
             print('Applying valid area mask')
-            mask = rasterio.open(mask_path)
-            mask = mask.read()
-            mask = mask[0].astype(int)
+            mask = as_class_array(self.grid.read(mask_path))
         else:
             # If no mask given: All area is valid (value 1)
-            mask = np.zeros((1400, 1400)) + 1
+            mask = self.grid.ones(dtype=CLASS_DTYPE)
 
-        arrays = []
+        merger = SceneMerger()
         for fid in layer_names:
-            rst = rasterio.open(
+            # Copy, the array read from the raster cache is read only.
+            # Scenes are read once, they are not cached.
+            array = np.array(as_class_array(self.grid.read(
                 os.path.join(os.path.dirname(output_filename),
-                             os.path.basename(fid).replace('.shp', '.tiff'))
-            )
-            array = rst.read()
-            array = array[0].astype(int)
+                             os.path.basename(fid).replace('.shp', '.tiff')),
+                cache=False
+            )))
 
             if 'ferry_box_data' in fid:
                 # FerryBox data only covers the actual ferrybox transect and
                 # can't "see" any other area.
-                array = np.where(array == 0, 4, array)
+                array[array == 0] = 4
 
             # Exclude areas marked with class value 2 or 3 outside
             # of our "valid_baws_area".
             # Mask value 1 marks valid area; Maske value 0 marks not valid area
-            array = np.where(
-                np.logical_and(
-                    mask == 0, np.logical_or(array == 2, array == 3)),
-                0, array
-            )
-            arrays.append(array)
+            array[np.logical_and(
+                mask == 0, np.logical_or(array == 2, array == 3))] = 0
+            merger.add(array)
 
-        daily_array = arrays[0]
-        if len(arrays) == 1:
-            pass
-        else:
-            for scene in arrays[1:]:
-                daily_array = np.where(
-                    np.logical_and(daily_array == 1,
-                                   scene == 0), 0, daily_array
-                )
-                daily_array = np.where(daily_array == 4, scene, daily_array)
-                daily_array = np.where(
-                    np.logical_and(daily_array != 3,
-                                   scene == 2), 2, daily_array
-                )
-                daily_array = np.where(scene == 3, 3, daily_array)
-
-        shape_list = self.get_shapes_from_raster(
-            daily_array, None, daymaps=False
+        daily_array = merger.array
+
+        polygons = self.get_shapes_from_raster(
+            daily_array, None, daymaps=False, grid=self.grid
         )
-        schema = {'properties': [('class', 'int')], 'geometry': 'Polygon'}
-        crs, transform, area_shape = area2transform_baws1000_sweref99tm()
+        write_shapefile(polygons, output_filename)
 
-        with fiona.open(output_filename, 'w', driver='ESRI Shapefile',
-                        crs=to_string(crs), schema=schema) as dst:
-            dst.writerecords(shape_list)
+    def merge_scene_windows(self, layer_paths, output_path,
+                            block_size=512):
+        """Merge scenes window by window and write the result to GeoTIFF.
 
-    def merge_scene_rasters(self, layer_paths=None, output_filename=None):
-        """"""
-        crs, transform, _ = area2transform_baws1000_sweref99tm()
-        daily_array = np.array(())
-        for fid in layer_paths:
-            rst = rasterio.open(fid)
-            array = rst.read()
-            array = array[0].astype(int)
-
-            if not daily_array.size:
-                daily_array = array
-            else:
-                daily_array = np.where(
-                    np.logical_and(daily_array == 1,
-                                   array == 0), 0, daily_array
-                )
-                daily_array = np.where(daily_array == 4, array, daily_array)
-                daily_array = np.where(
-                    np.logical_and(daily_array != 3,
-                                   array == 2), 2, daily_array
-                )
-                daily_array = np.where(array == 3, 3, daily_array)
-
-        bloom_array = np.where(
-            np.logical_or(daily_array == 3, daily_array == 2), 2,
-            np.zeros(daily_array.shape)
+        The output is written as a tiled GeoTIFF and we walk its block
+        windows. Only one window per scene is held in memory at a time.
+        Scenes that are not aligned with the grid are resampled on the fly
+        (nearest neighbour) through a WarpedVRT.
+
+        Args:
+            layer_paths: Iterable of paths to level 2 scene rasters.
+            output_path: Path to the merged GeoTIFF.
+            block_size: Window size in pixels (multiple of 16).
+        """
+        meta = self.grid.profile(
+            count=1, dtype=CLASS_DTYPE, compress='lzw', tiled=True,
+            blockxsize=block_size, blockysize=block_size
         )
-        bloom_array = np.where(daily_array == 1, 0,
-                               bloom_array).astype(np.uint8)
+        sources = []
+        try:
+            for fid in layer_paths:
+                src = rasterio.open(fid)
+                sources.append(src)
+                if not self.grid.matches(src):
+                    sources[-1] = WarpedVRT(
+                        src, crs=self.grid.crs, transform=self.grid.transform,
+                        width=self.grid.shape[1], height=self.grid.shape[0],
+                        resampling=Resampling.nearest
+                    )
+            with rasterio.open(output_path, 'w', **meta) as dst:
+                for _, window in dst.block_windows(1):
+                    merger = SceneMerger()
+                    for src in sources:
+                        merger.add(as_class_array(src.read(1, window=window)))
+                    dst.write(check_class_array(merger.array), 1,
+                              window=window)
+        finally:
+            for src in sources:
+                src.close()
+        raster_cache.invalidate(output_path)
+        return output_path
+
+    def merge_scene_rasters(self, layer_paths=None, output_filename=None,
+                            tiled=False, block_size=512,
+                            measure_memory=False):
+        """Merge scenes, filter small areas and write the merged shapefile.
 
+        Args:
+            layer_paths: Iterable of paths to level 2 scene rasters.
+            output_filename: Path to the merged shapefile.
+            tiled: If True the scenes are merged block window by block
+                   window into a GeoTIFF next to output_filename (see
+                   merge_scene_windows). Use for high resolution grids.
+            block_size: Window size in pixels (tiled mode).
+            measure_memory: If True the peak memory of the scene merge is
+                            traced (tracemalloc) into merge_peak_memory. If
+                            the caller is already tracing, the trace is left
+                            running and its peak so far is reported.
+        """
+        self.merge_peak_memory = None
+        start_trace = measure_memory and not tracemalloc.is_tracing()
+        if start_trace:
+            tracemalloc.start()
+        if tiled:
+            merged_path = self.merge_scene_windows(
+                layer_paths, output_filename.replace('.shp', '.tiff'),
+                block_size=block_size
+            )
+            # Copy, small areas are removed in place below.
+            daily_array = np.array(read_class_raster(merged_path,
+                                                     cache=False))
+        else:
+            merger = SceneMerger()
+            for fid in layer_paths:
+                # Scenes are read once, they are not cached.
+                merger.add(as_class_array(self.grid.read(fid, cache=False)))
+            daily_array = check_class_array(merger.array)
+        if measure_memory:
+            # Peak memory (bytes) of the scene merge, reported by
+            # BAWSAlgorithm.
+            _, self.merge_peak_memory = tracemalloc.get_traced_memory()
+        if start_trace:
+            tracemalloc.stop()
+
+        # Remove small bloom (class 2 and 3 as one area) and cloud areas.
         valid_areas = utils.valid_baws_area()
-        if bloom_array.any():
-            bloom_shape_list = self.get_shapes_from_raster(bloom_array, None)
-            mask_features = []
-            for shp in bloom_shape_list:
-                poly = shape(shp['geometry'])
-                if not poly.is_empty:
-                    if poly.area < valid_areas[2]:
-                        # valid_areas[2]: valid area for class 2 (and 3) bloom
-                        mask_features.append(shp["geometry"])
-            mask = rasterize(mask_features, bloom_array.shape,
-                             transform=transform)
-            daily_array = np.where(mask == 1, 0, daily_array)
-
-        shapes_from_raster = self.get_shapes_from_raster(daily_array, None)
-
-        shape_list = []
-        for shp in shapes_from_raster:
-            poly = shape(shp['geometry'])
-            if not poly.is_valid:
-                # This might be completely unnecessary since shapely 1.8
-                be = poly.exterior
-                mls = be.intersection(be)
-                polygons = polygonize(mls)
-                valid_bowtie = MultiPolygon(polygons)
-                for poly_of_multi in list(valid_bowtie):
-                    if poly_of_multi.is_valid:
-                        if shp['properties']['class'] == 1:
-                            if poly_of_multi.area < valid_areas[1]:
-                                continue
-                        new_shape = shp.copy()
-                        new_shape['geometry'] = mapping(poly_of_multi)
-                        shape_list.append(new_shape)
-            else:
-                if shp['properties']['class'] == 1:
-                    if poly.area < valid_areas[1]:
-                        continue
-                shape_list.append(shp)
-
-        schema = {'properties': [('class', 'int')], 'geometry': 'Polygon'}
-        with fiona.open(output_filename, 'w', driver='ESRI Shapefile',
-                        crs=to_string(crs), schema=schema) as dst:
-            dst.writerecords(shape_list)
+        remove_small_areas(daily_array, (2, 3), valid_areas[2], self.grid)
+        remove_small_areas(daily_array, (1, ), valid_areas[1], self.grid)
+
+        polygons = self.get_shapes_from_raster(daily_array, None,
+                                               grid=self.grid)
+
+        polygons, nr_repaired = repair_geometries(polygons)
+        if nr_repaired:
+            print('Repaired %i invalid polygons' % nr_repaired)
+        write_shapefile(polygons, output_filename)
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-19 00:55
+
+@author: a002028
+
+Raster read cache of the session.
+
+Reads of the same raster band are served from an in-process LRU cache of
+read only arrays, keyed by (path, band, modification time, size), within a
+memory budget (MAX_MEMORY, set with set_memory_budget). Hits and misses are
+counted, see cache_info. Rasters written through
+raster_profile.write_raster are invalidated, so stale data is never served.
+
+Only arrays in memory count against the budget. Memory maps of the disk
+cache are not resident (the OS pages them in and out), they are limited by
+number instead (MAX_MAPS), each one keeps its .npy file open.
+
+On a miss the band is read from the memory mapped disk cache: the first
+read of a raster band writes it uncompressed to a .npy file in the cache
+directory. Later reads open that file with np.load(mmap_mode='r'):
+no decompression, no copy, and the OS page cache is shared by all processes
+reading the same raster. The .npy file name contains the modification time
+and size of the raster, so a changed raster is read again.
+
+The disk cache is off until configure is called, then the band is read
+with rasterio. The directory and the memory budget are passed on to worker
+processes through the environment (BAWS_RASTER_CACHE, BAWS_RASTER_MEMORY).
+
+Usage:
+    raster_cache.configure('~/baws_raster_cache')
+    array = raster_cache.read_band(path)    # read only array
+    raster_cache.cache_info()
+"""
+import os
+import glob
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+import rasterio
+
+
+ENV_VARIABLE = 'BAWS_RASTER_CACHE'
+MEMORY_VARIABLE = 'BAWS_RASTER_MEMORY'
+
+# Max total size of the cache directory, the oldest files are removed by
+# configure.
+MAX_BYTES = 2 * 1024 ** 3
+
+# Default memory budget of the session cache (bytes per process).
+MAX_MEMORY = 512 * 1024 ** 2
+
+# Max number of memory maps kept by the session cache.
+MAX_MAPS = 32
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize',
+                                     'nr_arrays', 'nr_maps'))
+
+# {(abspath, band, mtime_ns, size): read only array}, oldest first. Shared by
+# the threads of the executor.
+_ARRAYS = OrderedDict()
+_LOCK = threading.Lock()
+_COUNTS = {'hits': 0, 'misses': 0}
+
+
+def configure(directory=None, max_bytes=MAX_BYTES):
+    """Turn the cache on (directory) or off (None).
+
+    Args:
+        directory: Folder for the .npy files (created if missing).
+        max_bytes: Files are removed, oldest first, down to this size.
+    """
+    if not directory:
+        os.environ.pop(ENV_VARIABLE, None)
+        return
+    directory = os.path.abspath(os.path.expanduser(str(directory)))
+    os.makedirs(directory, exist_ok=True)
+    os.environ[ENV_VARIABLE] = directory
+    prune(directory, max_bytes=max_bytes)
+
+
+def cache_directory():
+    """Return the cache directory, None if the cache is off."""
+    return os.environ.get(ENV_VARIABLE) or None
+
+
+def memory_budget():
+    """Return the memory budget of the session cache (bytes)."""
+    return int(os.environ.get(MEMORY_VARIABLE, MAX_MEMORY))
+
+
+def set_memory_budget(max_bytes=MAX_MEMORY):
+    """Set the memory budget of the session cache, 0 turns it off.
+
+    Args:
+        max_bytes: Arrays in memory are dropped, least recently used first,
+                   down to this size.
+    """
+    os.environ[MEMORY_VARIABLE] = str(int(max_bytes))
+    with _LOCK:
+        _trim(int(max_bytes))
+
+
+def cache_info():
+    """Return CacheInfo of the session cache.
+
+    currsize is the size (bytes) of the arrays in memory, nr_arrays the
+    number of cached arrays of which nr_maps are memory maps.
+    """
+    with _LOCK:
+        return CacheInfo(_COUNTS['hits'], _COUNTS['misses'], memory_budget(),
+                         sum(map(resident_bytes, _ARRAYS.values())),
+                         len(_ARRAYS),
+                         sum(isinstance(a, np.memmap)
+                             for a in _ARRAYS.values()))
+
+
+def clear():
+    """Empty the session cache and reset the counters."""
+    with _LOCK:
+        _ARRAYS.clear()
+        _COUNTS.update(hits=0, misses=0)
+
+
+def resident_bytes(array):
+    """Return bytes of array in memory (0 for a memory map)."""
+    return 0 if isinstance(array, np.memmap) else array.nbytes
+
+
+def _trim(max_bytes):
+    """Drop least recently used arrays until the arrays in memory are below
+    max_bytes and there are at most MAX_MAPS memory maps."""
+    total = sum(map(resident_bytes, _ARRAYS.values()))
+    nr_maps = sum(isinstance(a, np.memmap) for a in _ARRAYS.values())
+    for key, array in list(_ARRAYS.items()):
+        if isinstance(array, np.memmap):
+            if nr_maps <= MAX_MAPS and max_bytes:
+                continue
+            nr_maps -= 1
+        else:
+            if total <= max_bytes:
+                continue
+            total -= array.nbytes
+        del _ARRAYS[key]
+
+
+def invalidate(path):
+    """Forget all bands of the raster (call after writing it).
+
+    Args:
+        path: Path to the raster.
+    """
+    path = os.path.abspath(str(path))
+    with _LOCK:
+        for key in [k for k in _ARRAYS if k[0] == path]:
+            del _ARRAYS[key]
+    directory = cache_directory()
+    if directory:
+        name = hashlib.sha1(path.encode()).hexdigest()[:16]
+        for npy_path in glob.glob(os.path.join(directory, name + '_*.npy')):
+            try:
+                os.remove(npy_path)
+            except OSError:
+                continue
+
+
+def prune(directory, max_bytes=MAX_BYTES):
+    """Remove the oldest .npy files until the folder is below max_bytes."""
+    files = []
+    for path in glob.glob(os.path.join(directory, '*.npy')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # In use (Windows) or already removed by another process.
+            continue
+        total -= size
+
+
+def cache_path(path, band=1, directory=None):
+    """Return path to the .npy file of the raster band.
+
+    Args:
+        path: Path to the raster.
+        band: Band number.
+        directory: Cache directory (default: the configured one).
+    """
+    stat = os.stat(path)
+    name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(directory or cache_directory(), '%s_b%i_%i_%i.npy' % (
+        name, band, stat.st_mtime_ns, stat.st_size))
+
+
+def _remove_stale(npy_path):
+    """Remove .npy files of earlier versions of the same raster band."""
+    prefix = os.path.basename(npy_path).rsplit('_', 2)[0]
+    for path in glob.glob(os.path.join(os.path.dirname(npy_path),
+                                       prefix + '_*.npy')):
+        if path != npy_path:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+
+def read_band(path, band=1, cache=True):
+    """Return band of the raster as a read only array.
+
+    Copy the array before changing values.
+
+    Args:
+        path: Path to the raster.
+        band: Band number.
+        cache: If False the band is read with rasterio and not cached. Use
+               for rasters that are only read once (eg. level 2 scenes).
+    """
+    if not cache:
+        with rasterio.open(str(path)) as rst:
+            array = rst.read(band)
+        array.flags.writeable = False
+        return array
+
+    path = os.path.abspath(str(path))
+    stat = os.stat(path)
+    key = (path, band, stat.st_mtime_ns, stat.st_size)
+    with _LOCK:
+        array = _ARRAYS.get(key)
+        if array is not None:
+            _COUNTS['hits'] += 1
+            _ARRAYS.move_to_end(key)
+            return array
+        _COUNTS['misses'] += 1
+        # Older versions of the raster are never read again. Dropped before
+        # the read, so their memory maps do not keep the stale .npy files
+        # open (they can not be removed on Windows).
+        for old_key in [k for k in _ARRAYS if k[:2] == key[:2]]:
+            del _ARRAYS[old_key]
+
+    array = _read_band(path, band)
+    array.flags.writeable = False
+    max_bytes = memory_budget()
+    if max_bytes and resident_bytes(array) <= max_bytes:
+        with _LOCK:
+            _ARRAYS[key] = array
+            _trim(max_bytes)
+    return array
+
+
+def _read_band(path, band):
+    """Return band from the disk cache, or with rasterio if it is off."""
+    if not cache_directory():
+        with rasterio.open(path) as rst:
+            return rst.read(band)
+
+    npy_path = cache_path(path, band=band)
+    try:
+        return np.load(npy_path, mmap_mode='r')
+    except FileNotFoundError:
+        pass
+
+    with rasterio.open(path) as rst:
+        array = rst.read(band)
+    # Unique per call, threads of the same process may miss the same raster.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(npy_path),
+        prefix=os.path.basename(npy_path) + '.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, array)
+    try:
+        os.replace(tmp_path, npy_path)
+    except OSError:
+        # Another thread or process wrote (and maps) the same file.
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+    _remove_stale(npy_path)
+    return np.load(npy_path, mmap_mode='r')
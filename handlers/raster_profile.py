@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-19 00:05
+
+@author: a002028
+
+Output profiles of the BAWS rasters.
+
+Rasters are written as internally tiled GeoTIFFs in cloud optimized layout:
+nearest neighbour overviews are built in memory and the file is then copied
+to disk with the overviews in front of the full resolution data, so QGIS can
+redraw zoomed out maps from the overviews.
+
+Usage:
+    write_raster(path, array, meta, compression='deflate')
+"""
+import os
+from rasterio.enums import Resampling
+from rasterio.io import MemoryFile
+from rasterio.shutil import copy as copy_dataset
+
+from . import raster_cache
+
+
+# Creation options per compression. Predictor 2 (horizontal differencing)
+# helps on the large uniform areas of the class rasters.
+COMPRESSIONS = {
+    'lzw': {'compress': 'lzw'},
+    'deflate': {'compress': 'deflate', 'predictor': 2, 'zlevel': 6},
+    'zstd': {'compress': 'zstd', 'predictor': 2, 'zstd_level': 9},
+}
+
+# Compression of each product, see test/benchmark_raster_profile.py. Read
+# times are about the same for all three. The level 2 scenes are temporary
+# and written in bulk, lzw writes fastest. For the daymaps (speckled class
+# values) deflate and zstd are no smaller than lzw but write 2-2.5 times
+# slower, so lzw. Deflate makes the weekmaps (large uniform areas) 4 times
+# smaller than lzw and writes faster (zstd is a bit smaller still, but is
+# missing in some GDAL builds).
+PRODUCT_COMPRESSION = {
+    'scene': 'lzw',
+    'daymap': 'lzw',
+    'weekmap': 'deflate',
+}
+
+# Overviews are only built for the rasters that are displayed. The scenes
+# are read once by the merge.
+PRODUCT_OVERVIEWS = {
+    'scene': False,
+    'daymap': True,
+    'weekmap': True,
+}
+
+BLOCK_SIZE = 256
+
+
+def overview_levels(shape, block_size=BLOCK_SIZE):
+    """Return overview factors (2, 4, ..) down to about one block."""
+    levels = []
+    factor = 2
+    while max(shape) / factor >= block_size:
+        levels.append(factor)
+        factor *= 2
+    return levels
+
+
+def output_profile(meta, compression='lzw', block_size=BLOCK_SIZE):
+    """Return copy of meta for a tiled raster with compression.
+
+    Args:
+        meta: rasterio meta data, eg. from BAWSGrid.profile.
+        compression: One of COMPRESSIONS.
+        block_size: Tile size in pixels (multiple of 16).
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError('Unknown compression: %s (available: %s)'
+                         % (compression, ', '.join(COMPRESSIONS)))
+    profile = {k: v for k, v in meta.items()
+               if k not in ('compress', 'predictor', 'zlevel', 'zstd_level')}
+    profile.update(driver='GTiff', tiled=True, blockxsize=block_size,
+                   blockysize=block_size, **COMPRESSIONS[compression])
+    return profile
+
+
+def write_raster(path, array, meta, compression='lzw', overviews=True,
+                 block_size=BLOCK_SIZE):
+    """Write array as tiled GeoTIFF in cloud optimized layout.
+
+    Args:
+        path: Path to the raster file.
+        array: 2D array.
+        meta: rasterio meta data (crs, transform, dtype, ..).
+        compression: One of COMPRESSIONS.
+        overviews: If True nearest neighbour overviews are added.
+        block_size: Tile size in pixels.
+    """
+    profile = output_profile(meta, compression=compression,
+                             block_size=block_size)
+    profile.update(count=1, dtype=array.dtype.name,
+                   height=array.shape[0], width=array.shape[1])
+    levels = overview_levels(array.shape, block_size) if overviews else []
+    with MemoryFile() as memfile:
+        with memfile.open(**profile) as mem:
+            mem.write(array, 1)
+            if levels:
+                mem.build_overviews(levels, Resampling.nearest)
+            options = {k: v for k, v in profile.items()
+                       if k not in ('driver', 'count', 'dtype', 'width',
+                                    'height', 'crs', 'transform', 'nodata')}
+            # Written next to path and then moved, a half written raster is
+            # never picked up by QGIS or the batch jobs.
+            tmp_path = '%s.%i.tmp.tiff' % (os.path.splitext(path)[0],
+                                           os.getpid())
+            try:
+                copy_dataset(mem, tmp_path, driver='GTiff',
+                             copy_src_overviews=bool(levels), **options)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.isfile(tmp_path):
+                    os.remove(tmp_path)
+                raise
+    raster_cache.invalidate(path)
+    return path
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 23:20
+
+@author: a002028
+
+Bulk reprojection of geometries to the map projection.
+
+All coordinates of the geometries are taken out as one array, projected from
+the crs of the shapes straight to the map projection (no detour over
+EPSG:4326) in one pyproj call and put back with shapely.set_coordinates.
+"""
+from functools import lru_cache
+import numpy as np
+import pyproj
+import shapely
+
+
+class MapProjection:
+    """Transformation from a crs to the coordinates of a Basemap object."""
+
+    def __init__(self, map_obj, crs='EPSG:3006'):
+        """Initialize.
+
+        Basemap coordinates are the map projection shifted so that the lower
+        left corner is (0, 0). The shift is found by comparing map_obj with
+        the plain projection at the map centre.
+
+        Args:
+            map_obj: Basemap object (see MapHandler.map_obj).
+            crs: crs of the coordinates to transform.
+        """
+        map_crs = pyproj.CRS.from_dict(dict(map_obj.projparams))
+        self.transformer = pyproj.Transformer.from_crs(
+            pyproj.CRS.from_user_input(crs), map_crs, always_xy=True)
+        lon, lat = map_obj((map_obj.xmin + map_obj.xmax) / 2,
+                           (map_obj.ymin + map_obj.ymax) / 2, inverse=True)
+        x, y = pyproj.Transformer.from_crs(
+            'EPSG:4326', map_crs, always_xy=True).transform(lon, lat)
+        map_x, map_y = map_obj(lon, lat)
+        self.offset = np.array([map_x - x, map_y - y])
+
+    def transform_coordinates(self, coords):
+        """Return array (N, 2) of coordinates in the map projection."""
+        if not len(coords):
+            return coords
+        x, y = self.transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y]) + self.offset
+
+    def transform(self, geometries):
+        """Return geometries (array-like) in the map projection."""
+        geometries = np.asarray(geometries, dtype=object)
+        coords = shapely.get_coordinates(geometries)
+        return shapely.set_coordinates(geometries.copy(),
+                                       self.transform_coordinates(coords))
+
+
+@lru_cache(maxsize=4)
+def get_map_projection(map_obj, crs='EPSG:3006'):
+    """Return MapProjection (cached for the session).
+
+    Args:
+        map_obj: Basemap object.
+        crs: crs (string) of the coordinates to transform.
+    """
+    return MapProjection(map_obj, crs=crs)
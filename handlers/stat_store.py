@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 21:10
+
+@author: a002028
+"""
+import os
+import json
+import sqlite3
+
+
+# District of the statistics for the whole map.
+TOTAL = ''
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statistics (
+    date TEXT NOT NULL,
+    district TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value,
+    PRIMARY KEY (date, district, key)
+);
+CREATE INDEX IF NOT EXISTS statistics_district
+    ON statistics (district, date);
+"""
+
+
+def flatten(dictionary):
+    """Yield (date, district, key, value) rows of {date: statistics}.
+
+    Args:
+        dictionary: {date: {key: value, 'districts': {district: {...}}}}
+    """
+    for date, statistics in dictionary.items():
+        for key, value in statistics.items():
+            if key == 'districts':
+                for district, district_statistics in value.items():
+                    for k, v in district_statistics.items():
+                        yield str(date), str(district), k, v
+            else:
+                yield str(date), TOTAL, key, value
+
+
+class StatisticsStore:
+    """BAWS statistics in a SQLite database.
+
+    One row per date, district and key. Saving a day only writes the rows of
+    that day (in one transaction), the file is never rewritten. Use
+    to_dictionary / export_json to get the layout of baws_statistics.json.
+
+    Example:
+        store = StatisticsStore('.../baws_statistics.sqlite')
+        store.save({'20260715': {'daily_bloom_area': 3410.0, ...}})
+        store.to_dictionary(start='20260701', end='20260731', district='5')
+    """
+
+    def __init__(self, path, timeout=30):
+        """Initialize.
+
+        Args:
+            path: Path to the database file (created if missing).
+            timeout: Seconds to wait for another process writing to the
+                     database.
+        """
+        self.path = str(path)
+        self.timeout = timeout
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self):
+        """Return new connection to the database."""
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def save(self, dictionary):
+        """Insert or replace statistics.
+
+        Args:
+            dictionary: {date: statistics}, eg. from StatHandler.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO statistics VALUES (?, ?, ?, ?)',
+                    flatten(dictionary)
+                )
+        finally:
+            connection.close()
+
+    def import_json(self, path):
+        """Insert the statistics of a baws_statistics.json file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            self.save(json.load(f))
+
+    def query(self, start=None, end=None, district=None, key=None):
+        """Return list of (date, district, key, value) rows.
+
+        Args:
+            start: First date (YYYYMMDD), included.
+            end: Last date (YYYYMMDD), included.
+            district: District number, TOTAL ('') for the whole map
+                      (default: all).
+            key: Statistics key, eg. 'daily_bloom_area' (default: all).
+        """
+        conditions = []
+        parameters = []
+        for condition, parameter in (('date >= ?', start),
+                                     ('date <= ?', end),
+                                     ('district = ?', district),
+                                     ('key = ?', key)):
+            if parameter is not None:
+                conditions.append(condition)
+                parameters.append(str(parameter))
+        sql = 'SELECT date, district, key, value FROM statistics'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        # Districts in numeric order, the whole map first.
+        sql += ' ORDER BY date, length(district), district, rowid'
+        connection = self._connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def to_dictionary(self, **kwargs):
+        """Return {date: statistics} in the layout of baws_statistics.json.
+
+        Args:
+            kwargs: Filters, see query.
+        """
+        dictionary = {}
+        for date, district, key, value in self.query(**kwargs):
+            statistics = dictionary.setdefault(date, {})
+            if district != TOTAL:
+                statistics = statistics.setdefault(
+                    'districts', {}).setdefault(district, {})
+            statistics[key] = value
+        return dictionary
+
+    def export_json(self, path, indent=4, **kwargs):
+        """Write the statistics to a json file (baws_statistics.json).
+
+        The file is written next to path and then moved into place, so
+        readers never see a half written file.
+
+        Args:
+            path: Path to the json file.
+            indent: Indent of the json file.
+            kwargs: Filters, see query.
+        """
+        tmp_path = '%s.%i.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w') as outfile:
+            json.dump(self.to_dictionary(**kwargs), outfile, indent=indent)
+        os.replace(tmp_path, path)
+        return path
@@ -6,55 +6,90 @@ Created on 2019-06-11 16:50
 
 """
 import os
-import time
-from .. import utils
 from .. import writers
+from .stat_store import StatisticsStore
+from .zonal import ZonalStatistics
 
 
 class StatHandler:
-    """"""
+    """Bloom statistics from the daymap and weekmap rasters.
 
-    def __init__(self, settings, objects=None):
+    Areas are pixel counts times the grid cell area (see ZonalStatistics),
+    with the same keys as the area_dict of DailyShapeHandler and
+    WeeklyShapeHandler plus statistics per district.
+    """
+
+    def __init__(self, settings, daymap_path=None, weekmap_path=None):
         """Initialize.
 
         Args:
-            settings:
-            objects:
+            settings: Settings with district_path, grid and the statistics
+                      directory.
+            daymap_path: Path to the daymap (raster or shapefile, the raster
+                         next to the shapefile is used).
+            weekmap_path: Path to the weekmap (raster or shapefile).
         """
         self.settings = settings
-        self.objects = objects or []
+        self.daymap_path = daymap_path
+        self.weekmap_path = weekmap_path
 
-    def _queue(self):
-        """"""
-        while not all([obj.active_area for obj in self.objects]):
-            time.sleep(0.1)
-        return
+    @staticmethod
+    def _raster_paths(path):
+        """Return list with the raster path of a daymap / weekmap."""
+        if not path:
+            return None
+        return [os.path.splitext(path)[0] + '.tiff']
 
     def _get_dictionary(self):
-        """"""
-        dictionary = {}
-        for obj in self.objects:
-            dictionary = utils.recursive_dict_update(dictionary, obj.area_dict)
-        return dictionary
+        """Return {date: statistics} of the daymap and weekmap."""
+        zonal = ZonalStatistics(self.settings.district_path,
+                                grid=self.settings.grid)
+        return zonal.season_statistics(
+            daymap_paths=self._raster_paths(self.daymap_path),
+            weekmap_paths=self._raster_paths(self.weekmap_path)
+        )
 
     def save_statistics(self):
-        """"""
-        self._queue()
-        dictionary = self._get_dictionary()
-        dictionary = {self.settings.current_working_date: dictionary}
-        statistics_path = os.path.join(
+        """Save the statistics to the statistics store.
+
+        Only the days of the daymap / weekmap are written (upsert).
+        baws_statistics.json is written on demand, see export_statistics.
+        """
+        self.get_store().save(self._get_dictionary())
+        print('New statistics saved!')
+
+    def _statistics_path(self, extension):
+        """Return path to the baws_statistics file with extension."""
+        return os.path.join(
             self.settings.baws_USER_SELECTED_statistics_directory,
-            'baws_statistics.json'
+            'baws_statistics' + extension
         )
-        if os.path.isfile(statistics_path):
-            stat_file = self.settings.jh.read(statistics_path)
-        else:
-            stat_file = {}
 
-        stat_file = utils.recursive_dict_update(stat_file, dictionary)
-        self.settings.jh.write(dictionary=stat_file, out_source=statistics_path)
-        print('New statistics saved!')
-        print('\nBAWS task completed!')
+    def get_store(self):
+        """Return the StatisticsStore (baws_statistics.sqlite).
+
+        A new store starts with the statistics of baws_statistics.json.
+        """
+        store_path = self._statistics_path('.sqlite')
+        json_path = self._statistics_path('.json')
+        new_store = not os.path.isfile(store_path)
+        store = StatisticsStore(store_path)
+        if new_store and os.path.isfile(json_path):
+            store.import_json(json_path)
+        return store
+
+    def export_statistics(self, path=None, **kwargs):
+        """Write the store to json (default: baws_statistics.json).
+
+        The whole file is rewritten, the plugin does it once when it is
+        unloaded (if statistics were saved in the session).
+
+        Args:
+            path: Path to the json file.
+            kwargs: Filters, see StatisticsStore.query.
+        """
+        return self.get_store().export_json(
+            path or self._statistics_path('.json'), **kwargs)
 
     def _write(self, text, dst_path):
         """"""
@@ -57,7 +57,8 @@ class TextFileHandler:
             daymap_path=self.daymap_path,
             weekmap_path=self.weekmap_path,
             start_date=self.settings.date_range_composite[0],
-            end_date=self.settings.date_range_composite[-1]
+            end_date=self.settings.date_range_composite[-1],
+            grid=self.settings.grid
         )
         for fid in files_to_copy:
             file_name = os.path.basename(fid)
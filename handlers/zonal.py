@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 20:40
+
+@author: a002028
+"""
+from .. import utils
+from .composite import date_from_path
+from .districts import get_district_index
+from .grid import grid_from_shape
+
+
+# Same keys as the statistics from DailyShapeHandler / WeeklyShapeHandler.
+DAY_AREAS = {2: 'subsurface_area', 3: 'surface_area'}
+DAY_SUM_KEY = 'daily_bloom_area'
+WEEK_AREAS = {i: '%i-day bloom' % i for i in range(1, 8)}
+WEEK_SUM_KEY = 'weekly_bloom_area'
+CLOUD_KEY = 'cloud_cover_ratio'
+
+
+class ZonalStatistics:
+    """Per district statistics of daymap and weekmap rasters.
+
+    Uses the count table of DistrictIndex (pixels per district and value,
+    one np.bincount per raster), areas are pixel counts times the grid cell
+    area.
+
+    Example:
+        zonal = ZonalStatistics(settings.district_path, grid=settings.grid)
+        zonal.daymap_statistics('.../cyano_daymap_20260715.tiff')
+        {'subsurface_area': 3410.0, ...,
+         'districts': {'5': {'subsurface_area': 120.0, ...}, ...}}
+    """
+
+    def __init__(self, path_to_districts, grid=None):
+        """Initialize.
+
+        Args:
+            path_to_districts: Path to the districts raster.
+            grid: BAWSGrid of the rasters (default: found from the
+                  districts raster).
+        """
+        self.index = get_district_index(path_to_districts, grid=grid)
+        self.grid = grid or grid_from_shape(self.index.shape)
+
+    def to_km2(self, nr_pixels):
+        """Return area (km2) of nr_pixels cells, rounded to one decimal."""
+        return utils.round_value(nr_pixels * self.grid.cell_area / 10 ** 6,
+                                 nr_decimals=1, out_format=float)
+
+    def areas(self, counts, mapping, sum_key):
+        """Return {key: area} of the values in mapping and their sum.
+
+        Args:
+            counts: Pixel counts per value (one row of the count table).
+            mapping: {value: key}
+            sum_key: Key of the sum of all values in mapping.
+        """
+        areas = {key: self.to_km2(counts[value])
+                 for value, key in mapping.items()}
+        areas[sum_key] = self.to_km2(sum(counts[value] for value in mapping))
+        return areas
+
+    def _district_statistics(self, table, mapping, sum_key, cloud=False):
+        """Return {district: areas} for all districts."""
+        districts = {}
+        for district in range(1, self.index.nr_districts):
+            if not self.index.sizes[district]:
+                continue
+            stats = self.areas(table[district], mapping, sum_key)
+            if cloud:
+                stats[CLOUD_KEY] = round(
+                    float(table[district, 1]) / self.index.sizes[district], 2)
+            districts[str(district)] = stats
+        return districts
+
+    def daymap_statistics(self, path):
+        """Return bloom areas of a daymap, in total and per district.
+
+        The districts also get their cloud cover ratio.
+
+        Args:
+            path: Path to the daymap raster.
+        """
+        table = self.index.file_class_counts(path)
+        statistics = self.areas(table.sum(axis=0), DAY_AREAS, DAY_SUM_KEY)
+        statistics['districts'] = self._district_statistics(
+            table, DAY_AREAS, DAY_SUM_KEY, cloud=True)
+        return statistics
+
+    def weekmap_statistics(self, path):
+        """Return areas per number of bloom days, in total and per district.
+
+        Args:
+            path: Path to the weekmap raster.
+        """
+        table = self.index.file_class_counts(path)
+        statistics = self.areas(table.sum(axis=0), WEEK_AREAS, WEEK_SUM_KEY)
+        statistics['districts'] = self._district_statistics(
+            table, WEEK_AREAS, WEEK_SUM_KEY)
+        return statistics
+
+    def season_statistics(self, daymap_paths=None, weekmap_paths=None):
+        """Return {date: statistics} for many daymaps and weekmaps.
+
+        Args:
+            daymap_paths: Iterable of paths to daymap rasters.
+            weekmap_paths: Iterable of paths to weekmap rasters.
+        """
+        statistics = {}
+        for paths, func in ((daymap_paths, self.daymap_statistics),
+                            (weekmap_paths, self.weekmap_statistics)):
+            for path in paths or ():
+                utils.recursive_dict_update(
+                    statistics.setdefault(date_from_path(path), {}),
+                    func(path)
+                )
+        return statistics
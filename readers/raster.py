@@ -4,7 +4,11 @@ Created on 2019-05-16 15:07
 
 @author: a002028
 """
-from qgis.core import QgsRasterLayer
+try:
+    from qgis.core import QgsRasterLayer
+except ImportError:
+    # Headless use (see batch.py), the QGIS reader is not available.
+    QgsRasterLayer = None
 
 
 class QGISRasterReaderBase:
@@ -4,8 +4,12 @@ Created on 2019-05-16 15:07
 
 @author: a002028
 """
-from qgis.core import QgsVectorLayer
 import geopandas as gp
+try:
+    from qgis.core import QgsVectorLayer
+except ImportError:
+    # Headless use (see batch.py), only the geopandas reader works.
+    QgsVectorLayer = None
 
 
 class QGISShapeReaderBase:
@@ -6,5 +6,6 @@ Created on 2019-06-12 16:15
 """
 from .create_stw_file import create_stw
 from .delete_and_copy import replace_directory
-from .files_ready import check_while_saving
-from .rasterize import rasterize_file
+from .pool import get_process_pool, shutdown_process_pools
+from .render_maps import MapTemplate, render_maps, start_map_workers
+from .rasterize import rasterize_file, rasterize_files, wait_for_rasterization
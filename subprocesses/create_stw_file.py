@@ -5,59 +5,93 @@ Created on 2019-06-24 16:30
 @author: a002028
 """
 import os
+from functools import lru_cache
 import numpy as np
-import fiona
 import rasterio
-from rasterio import features
+from rasterio.warp import reproject, Resampling
+from ..handlers.raster_cache import read_band
+
+
+STW_SHAPE = (140, 140)
 
 
 def area2transform_baws10000_sweref99tm():
     """"""
     west, south, east, north = (-49739.0, 5954123.0, 1350261.0, 7354123.0)
-    height, width = (140, 140)
+    height, width = STW_SHAPE
     transform = rasterio.transform.from_bounds(west, south,
                                                east, north,
                                                width, height)
-    return transform, (140, 140)
+    return transform, STW_SHAPE
+
+
+@lru_cache(maxsize=4)
+def load_lons_lats(lon_path, lat_path):
+    """Return memory mapped longitude and latitude grids (cached)."""
+    return np.load(lon_path, mmap_mode='r'), np.load(lat_path, mmap_mode='r')
 
 
 def get_stw_lats_lons(lon_path, lat_path, bloom_idx):
     """"""
-    lons = np.load(lon_path)
-    lats = np.load(lat_path)
+    lons, lats = load_lons_lats(str(lon_path), str(lat_path))
     return np.array([lats[bloom_idx], lons[bloom_idx]]).transpose()
 
 
-def save_empty_file(save_path):
-    """"""
-    with open(save_path, 'w') as file:
-        file.write('no_stw')
-    file.close()
+def surface_bloom_cells(array, rst):
+    """Return boolean array, True for 10 km cells with surface bloom.
+
+    A cell has surface bloom if the 1 km pixel at the centre of the cell is
+    class 3. This is what rasterizing the class 3 polygons onto the 10 km
+    grid gave: with an even block size the cell centre is a pixel corner,
+    and GDAL burns it from the pixel below to the left of it.
+
+    Args:
+        array: Daily class array.
+        rst: Open rasterio dataset of the daily class raster.
+    """
+    surface = array == 3
+    transform, shape = area2transform_baws10000_sweref99tm()
+    fy, fx = (surface.shape[0] / shape[0], surface.shape[1] / shape[1])
+    if rst.transform * (0, 0) == transform * (0, 0) and \
+            fy.is_integer() and fx.is_integer():
+        # Same extent with whole blocks (1000 m grid): take the centre pixel
+        # of each block.
+        fy, fx = int(fy), int(fx)
+        return surface[fy // 2::fy, (fx - 1) // 2::fx]
+    cells = np.zeros(shape, dtype=np.uint8)
+    reproject(surface.astype(np.uint8), cells,
+              src_transform=rst.transform, src_crs=rst.crs,
+              dst_transform=transform, dst_crs=rst.crs,
+              resampling=Resampling.nearest)
+    return cells == 1
 
 
 def create_stw(cyano_file_path, file_tag, lon_path, lat_path):
-    """"""
+    """Create SeaTrackWeb file with surface bloom positions.
+
+    The 10 km surface bloom cells are taken from the daily class raster
+    (cyano_file_path with .tiff, written by RasterHandler.rasterize).
+
+    Returns:
+        Path to the SeaTrackWeb file, or None if there are no large surface
+        accumulations (no file is written and an existing one is removed).
+    """
     out_folder = os.path.dirname(os.path.realpath(cyano_file_path))
     stw_file_path = os.path.join(
         out_folder,
         '_'.join(['stw', file_tag]) + '.txt'
     )
-    with fiona.open(cyano_file_path, "r") as shapefile:
-        shapes = []
-        for shp in shapefile:
-            if shp['properties']['class'] == 3:
-                shapes.append((shp['geometry'], 3))
-
-    if shapes:
-        transform, shape = area2transform_baws10000_sweref99tm()
-        burned = features.rasterize(shapes=shapes, fill=0, out=np.zeros(shape),
-                                    transform=transform)
-        bloom_indices = np.where(burned == 3)
-        if np.shape(bloom_indices)[1] > 5:
-            coordinates = get_stw_lats_lons(lon_path, lat_path, bloom_indices)
-            np.savetxt(stw_file_path, coordinates, delimiter='\t',
-                       fmt='%1.4f')
-        else:
-            save_empty_file(stw_file_path)
-    else:
-        save_empty_file(stw_file_path)
+    raster_path = os.path.splitext(cyano_file_path)[0] + '.tiff'
+    with rasterio.open(raster_path) as rst:
+        cells = surface_bloom_cells(read_band(raster_path), rst)
+
+    bloom_indices = np.where(cells)
+    if np.shape(bloom_indices)[1] > 5:
+        coordinates = get_stw_lats_lons(lon_path, lat_path, bloom_indices)
+        np.savetxt(stw_file_path, coordinates, delimiter='\t',
+                   fmt='%1.4f')
+        return stw_file_path
+    if os.path.isfile(stw_file_path):
+        # Positions of an earlier version of the daymap.
+        os.remove(stw_file_path)
+    return None
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 13:20
+
+@author: a002028
+"""
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+_POOLS = {}
+
+
+def python_executable():
+    """Return path to the python interpreter.
+
+    Inside QGIS sys.executable is the QGIS application (eg. qgis-bin.exe)
+    and not python, so worker processes would start a new QGIS instance.
+    """
+    name = os.path.basename(sys.executable).lower()
+    if name.startswith('python'):
+        return sys.executable
+    for folder in (sys.exec_prefix, os.path.join(sys.exec_prefix, 'bin')):
+        for exe in ('pythonw.exe', 'python.exe', 'python3'):
+            path = os.path.join(folder, exe)
+            if os.path.isfile(path):
+                return path
+    return sys.executable
+
+
+def default_workers():
+    """Return default number of worker processes (one core is left)."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def spawn_context():
+    """Return the "spawn" multiprocessing context.
+
+    Inside QGIS sys.executable is the QGIS application, so spawn is told to
+    start python_executable instead. That setting is global for the spawn
+    start method (multiprocessing.spawn) and not per context, so it is only
+    changed in that case. Everywhere else the default is kept.
+    """
+    context = multiprocessing.get_context('spawn')
+    executable = python_executable()
+    if executable != sys.executable:
+        context.set_executable(executable)
+    return context
+
+
+class SharedProcessPool:
+    """ProcessPoolExecutor that is replaced when it breaks.
+
+    A pool breaks when a worker dies or its initializer fails, after that
+    it refuses all new jobs (BrokenProcessPool). submit then starts a new
+    pool and submits the job to it.
+    """
+
+    def __init__(self, name, max_workers=None, initializer=None,
+                 initargs=()):
+        """Initialize.
+
+        Args:
+            name: Name of the pool (used in messages).
+            max_workers: Max number of worker processes.
+            initializer: Function called in each worker process.
+            initargs: Arguments to pass to initializer.
+        """
+        self.name = name
+        self._kwargs = dict(max_workers=max_workers or default_workers(),
+                            initializer=initializer, initargs=initargs)
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        """Return a new ProcessPoolExecutor."""
+        return ProcessPoolExecutor(mp_context=spawn_context(),
+                                   **self._kwargs)
+
+    def submit(self, call_function, *args, **kwargs):
+        """Submit job and return its Future (see ProcessPoolExecutor)."""
+        try:
+            return self._pool.submit(call_function, *args, **kwargs)
+        except BrokenProcessPool as e:
+            print('Process pool %s is broken (%s), restarting it'
+                  % (self.name, e))
+            self._pool.shutdown(wait=False)
+            self._pool = self._new_pool()
+            return self._pool.submit(call_function, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """Shutdown the worker processes.
+
+        Args:
+            wait: If True, wait for running jobs to finish.
+        """
+        self._pool.shutdown(wait=wait)
+
+
+def get_process_pool(name='default', max_workers=None, initializer=None,
+                     initargs=()):
+    """Return shared process pool (SharedProcessPool).
+
+    Worker processes are started with "spawn" so that they never inherit the
+    state of QGIS (threads, Qt objects).
+
+    Args:
+        name: Name of the pool. Each name gets its own pool.
+        max_workers: Max number of worker processes
+                     (default: number of cores - 1).
+        initializer: Function called in each worker process when it starts
+                     (only used when the pool is created).
+        initargs: Arguments to pass to initializer.
+    """
+    if name not in _POOLS:
+        _POOLS[name] = SharedProcessPool(
+            name, max_workers=max_workers, initializer=initializer,
+            initargs=initargs)
+    return _POOLS[name]
+
+
+def shutdown_process_pools(wait=True):
+    """Shutdown all shared process pools.
+
+    Args:
+        wait: If True, wait for running jobs to finish.
+    """
+    for name in list(_POOLS):
+        _POOLS.pop(name).shutdown(wait=wait)
@@ -5,10 +5,16 @@ Created on 2020-05-15 17:53
 @author: a002028
 """
 import os
-import rasterio as rio
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
 from rasterio import features
 import geopandas as gpd
 from .. import utils
+from ..handlers.geometry import repair_geometries
+from ..handlers.raster_profile import (PRODUCT_COMPRESSION,
+                                       PRODUCT_OVERVIEWS, write_raster)
+from .pool import get_process_pool
 
 
 def filter_feature(gp_shapes):
@@ -24,16 +30,80 @@ def filter_feature(gp_shapes):
 
 
 def rasterize_file(meta, folder_path, fid):
-    """"""
+    """Rasterize shapefile.
+
+    Returns:
+        Path to the raster, seconds and the number of repaired geometries.
+    """
+    start_time = time.time()
     shapes = gpd.read_file(fid)
     shapes = filter_feature(shapes)
-    shapes.geometry = shapes.buffer(0)
+    shapes, nr_repaired = repair_geometries(shapes)
     save_path = os.path.join(folder_path,
                              os.path.basename(fid).replace('.shp', '.tiff'))
-    with rio.open(save_path, 'w+', **meta) as out:
-        out_arr = out.read(1)
-        shapes = ((geom, value) for geom, value in zip(shapes['geometry'],
-                                                       shapes['class']))
-        burned = features.rasterize(shapes=shapes, fill=0, out=out_arr,
-                                    transform=out.transform)
-        out.write_band(1, burned)
+    out_arr = np.zeros((meta['height'], meta['width']), dtype=meta['dtype'])
+    if len(shapes):
+        features.rasterize(
+            shapes=zip(shapes['geometry'], shapes['class']),
+            fill=0, out=out_arr, transform=meta['transform']
+        )
+    write_raster(save_path, out_arr, meta,
+                 compression=PRODUCT_COMPRESSION['scene'],
+                 overviews=PRODUCT_OVERVIEWS['scene'])
+    return save_path, time.time() - start_time, nr_repaired
+
+
+def rasterize_files(meta, folder_path, fids, max_workers=None):
+    """Rasterize shapefiles in a bounded process pool.
+
+    Args:
+        meta: rasterio meta data of the output rasters.
+        folder_path: Folder to save the rasters in.
+        fids: Iterable of paths to shapefiles.
+        max_workers: Max number of worker processes.
+
+    Returns:
+        Dictionary {shapefile path: Future}. The result of each future is
+        (raster path, seconds, number of repaired geometries).
+    """
+    pool = get_process_pool(name='rasterize', max_workers=max_workers)
+    return {fid: pool.submit(rasterize_file, meta, folder_path, fid)
+            for fid in fids}
+
+
+def wait_for_rasterization(futures, timeout=None):
+    """Wait for the rasterization jobs, print timings and raise on errors.
+
+    Args:
+        futures: Dictionary {shapefile path: Future}
+                 (see rasterize_files).
+        timeout: Max number of seconds to wait (for all files).
+
+    Returns:
+        List of raster paths.
+    """
+    start_time = time.time()
+    deadline = None if timeout is None else start_time + timeout
+    paths = []
+    errors = []
+    for fid, future in futures.items():
+        remaining = None if deadline is None else max(
+            0., deadline - time.time())
+        try:
+            save_path, seconds, nr_repaired = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            errors.append('%s: not done within %s sec'
+                          % (os.path.basename(fid), timeout))
+            continue
+        except Exception as e:
+            errors.append('%s: %s' % (os.path.basename(fid), e))
+            continue
+        paths.append(save_path)
+        print('Rasterized %s in %.1f sec (%i geometries repaired)'
+              % (os.path.basename(fid), seconds, nr_repaired))
+    if errors:
+        raise RuntimeError('Rasterization failed for:\n' + '\n'.join(errors))
+    print('\nReady to merge shapefiles! (waited %.1f sec for rasterization)'
+          '\n' % (time.time() - start_time))
+    return paths
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 22:50
+
+@author: a002028
+
+Day and week PNG-maps rendered in worker processes (Agg backend).
+
+Each worker loads the map template (MapHandler) once when it starts, so the
+day and the week map are rendered at the same time and the QGIS main thread
+is never busy with plotting.
+
+Usage:
+    template = MapTemplate(path_figure, path_basemap, cache_directory)
+    start_map_workers(template)     # at start up, preloads the templates
+    futures = render_maps(template, [('day', daymap_path),
+                                     ('week', weekmap_path)])
+"""
+import time
+from collections import namedtuple
+
+from .pool import get_process_pool
+
+
+# One worker for the day map and one for the week map.
+MAP_WORKERS = 2
+
+MapTemplate = namedtuple(
+    'MapTemplate',
+    ['path_figure', 'path_basemap', 'cache_directory', 'render_mode'],
+    defaults=[None, 'raster']
+)
+
+# MapHandler of the worker process, see load_map_template.
+_MAP_HANDLER = None
+
+
+def load_map_template(*template):
+    """Load the map template in the worker process (pool initializer)."""
+    global _MAP_HANDLER
+    import matplotlib
+    matplotlib.use('Agg')
+    from ..handlers.map import MapHandler
+    template = MapTemplate(*template)
+    _MAP_HANDLER = MapHandler(
+        path_figure=str(template.path_figure),
+        path_basemap=str(template.path_basemap),
+        cache_directory=template.cache_directory,
+        render_mode=template.render_mode
+    )
+    _MAP_HANDLER.initialize_maps()
+
+
+def map_template_loaded():
+    """Return True if the worker has loaded the map template."""
+    return _MAP_HANDLER is not None
+
+
+def get_shape_handler(name, file_path):
+    """Return Daily- or WeeklyShapeHandler with the shapes of file_path."""
+    from ..handlers.layer import DailyShapeHandler, WeeklyShapeHandler
+    handler = {'day': DailyShapeHandler,
+               'week': WeeklyShapeHandler}[name]()
+    handler.read(file_path)
+    return handler
+
+
+def render_map(name, file_path):
+    """Render the day or week PNG-map of file_path in the worker.
+
+    Returns:
+        Path to the PNG file and seconds.
+    """
+    start_time = time.time()
+    shape_handler = None
+    if not _MAP_HANDLER.uses_raster(name, file_path):
+        shape_handler = get_shape_handler(name, file_path)
+    png_path = _MAP_HANDLER.save_png_map(name, file_path,
+                                         shape_handler=shape_handler)
+    if not _MAP_HANDLER.cache_directory:
+        # Patches are added to the figures, start over with clean ones.
+        _MAP_HANDLER.initialize_maps()
+    return png_path, time.time() - start_time
+
+
+def get_map_pool(template):
+    """Return the process pool of the map workers."""
+    return get_process_pool(name='maps', max_workers=MAP_WORKERS,
+                            initializer=load_map_template,
+                            initargs=tuple(template))
+
+
+def start_map_workers(template):
+    """Start the map workers, they load the template in the background.
+
+    Returns:
+        List of futures, done when the workers are ready.
+    """
+    pool = get_map_pool(template)
+    return [pool.submit(map_template_loaded) for _ in range(MAP_WORKERS)]
+
+
+def render_maps(template, maps):
+    """Render PNG-maps in the map workers.
+
+    Args:
+        template: MapTemplate.
+        maps: Iterable of (name, shapefile path), name is 'day' or 'week'.
+              Maps without a path are skipped.
+
+    Returns:
+        Dictionary {name: Future}. The result of each future is (PNG path,
+        seconds).
+    """
+    pool = get_map_pool(template)
+    return {name: pool.submit(render_map, name, str(path))
+            for name, path in maps if path}
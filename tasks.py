@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 14:10
+
+@author: a002028
+
+Completion layer for background work. Every background job returns a
+concurrent.futures.Future, dependent steps wait on it (with a timeout)
+instead of polling files, and a failed job raises TaskError.
+"""
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class TaskError(Exception):
+    """Raised when a background task fails or does not finish in time."""
+
+
+def wait_for(futures, timeout=None, name='Background task'):
+    """Wait for futures and return their results.
+
+    Args:
+        futures: Future or iterable of futures.
+        timeout: Max number of seconds to wait (for all futures).
+        name: Name of the task, used in error messages.
+
+    Raises:
+        TaskError: If any task failed or did not finish within timeout.
+    """
+    single = isinstance(futures, Future)
+    futures = [futures] if single else list(futures)
+    deadline = None if timeout is None else time.time() + timeout
+    results = []
+    for future in futures:
+        remaining = None if deadline is None else max(
+            0., deadline - time.time())
+        try:
+            results.append(future.result(timeout=remaining))
+        except FutureTimeoutError:
+            raise TaskError('%s did not finish within %s sec'
+                            % (name, timeout))
+        except Exception as e:
+            raise TaskError('%s failed: %s' % (name, e)) from e
+    return results[0] if single else results
+
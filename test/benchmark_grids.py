@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 11:50
+
+@author: a002028
+
+Benchmark of the 1000 m and the 300 m production grid on the same synthetic
+day (merge of level 2 scenes, polygonization and rasterization of the
+daymap). Prints wall clock time and peak numpy memory for both grids.
+
+Run from the folder above the plugin folder:
+    python -m BAWS.test.benchmark_grids
+"""
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import rasterio
+
+from BAWS.handlers.grid import get_grid
+from BAWS.handlers.raster import RasterHandler
+
+
+def synthetic_day(nr_scenes=8, seed=1):
+    """Return list of blobby 1000 m scenes with class values 0-4."""
+    rng = np.random.default_rng(seed)
+    coarse = (70, 70)
+    scenes = []
+    for _ in range(nr_scenes):
+        array = rng.choice(5, size=coarse, p=[0.35, 0.3, 0.1, 0.05, 0.2])
+        array = array.repeat(20, axis=0).repeat(20, axis=1)
+        scenes.append(array.astype(np.uint8))
+    return scenes
+
+
+def write_scenes(scenes, grid, directory):
+    """Write scenes resampled onto grid and return the file paths."""
+    src_grid = get_grid(1000)
+    meta = grid.profile(compress='lzw')
+    paths = []
+    for i, scene in enumerate(scenes):
+        if grid is not src_grid:
+            scene = grid.warp(scene, src_grid.transform)
+        path = os.path.join(directory, 'scene_%i_%s.tiff' % (i, grid.name))
+        with rasterio.open(path, 'w', **meta) as dst:
+            dst.write(scene, 1)
+        paths.append(path)
+    return paths
+
+
+def run(grid, scenes, directory):
+    """Return seconds and peak memory (MB) for one production day."""
+    paths = write_scenes(scenes, grid, directory)
+    handler = RasterHandler(grid=grid)
+    merged_path = os.path.join(directory, 'Cyano_merged_%s.shp' % grid.name)
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    handler.merge_scene_rasters(layer_paths=paths,
+                                output_filename=merged_path)
+    handler.rasterize(merged_path)
+    seconds = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+
+if __name__ == '__main__':
+    day = synthetic_day()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for resolution in (1000, 300):
+            grid = get_grid(resolution)
+            results[resolution] = run(grid, day, tmp_dir)
+            print('%s: %.2f sec, peak memory %.0f MB'
+                  % ((grid, ) + results[resolution]))
+    print('300 m / 1000 m: time x%.1f, memory x%.1f (cells x%.1f)' % (
+        results[300][0] / results[1000][0],
+        results[300][1] / results[1000][1],
+        get_grid(300).size / get_grid(1000).size
+    ))
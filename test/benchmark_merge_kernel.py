@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 09:40
+
+@author: a002028
+
+Benchmark of the lookup table merge (handlers.merge.SceneMerger) against the
+chained np.where merge previously used in RasterHandler.merge_scene_rasters.
+
+Run from the folder above the plugin folder:
+    python -m BAWS.test.benchmark_merge_kernel
+"""
+import time
+import numpy as np
+
+from BAWS.handlers.merge import SceneMerger
+
+
+def synthetic_scenes(nr_scenes, shape, seed=1):
+    """Return list of int64 scenes with class values 0-4."""
+    rng = np.random.default_rng(seed)
+    return [rng.choice(5, size=shape, p=[0.35, 0.3, 0.1, 0.05, 0.2])
+            for _ in range(nr_scenes)]
+
+
+def where_chain(arrays):
+    """The merge as it was done before SceneMerger (int64 np.where chain)."""
+    daily_array = np.array(())
+    for array in arrays:
+        array = array.astype(int)
+        if not daily_array.size:
+            daily_array = array
+        else:
+            daily_array = np.where(
+                np.logical_and(daily_array == 1,
+                               array == 0), 0, daily_array
+            )
+            daily_array = np.where(daily_array == 4, array, daily_array)
+            daily_array = np.where(
+                np.logical_and(daily_array != 3,
+                               array == 2), 2, daily_array
+            )
+            daily_array = np.where(array == 3, 3, daily_array)
+    return daily_array
+
+
+def lookup_table(arrays):
+    """The merge using SceneMerger."""
+    return SceneMerger().merge(arrays)
+
+
+def timeit(func, arrays, repeat=3):
+    """Return best time of repeat runs and the result."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func(arrays)
+        times.append(time.perf_counter() - start_time)
+    return min(times), result
+
+
+if __name__ == '__main__':
+    for shape in ((1400, 1400), (4667, 4667)):
+        scenes = synthetic_scenes(12, shape)
+        uint8_scenes = [s.astype(np.uint8) for s in scenes]
+        t_where, ref = timeit(where_chain, scenes)
+        t_lut, res = timeit(lookup_table, uint8_scenes)
+        assert np.array_equal(ref, res), 'Merge results differ!'
+        print('grid %ix%i, 12 scenes: np.where chain %.3f sec, '
+              'lookup table %.3f sec (x%.1f)'
+              % (shape + (t_where, t_lut, t_where / t_lut)))
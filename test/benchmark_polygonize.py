@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 18:55
+
+@author: a002028
+
+Benchmark of the class group polygonization (handlers.polygonize) against
+the full grid shapes() loop with per-feature dictionaries previously used in
+RasterHandler.get_shapes_from_raster, on a dense cloudy day of the 1000 m
+and the 300 m grid, and the class groups traced in worker processes
+(polygonize(parallel=True)) against in process.
+
+The feature loop is only run on the 1000 m grid, on the 300 m grid it needs
+more than 5 GB of memory.
+
+Results (one core, 6 GB):
+    1000 m  feature loop  class groups  worker processes
+    classes     6.08 sec      2.17 sec   3.15 sec (x0.7)
+    daymaps     8.18 sec      2.40 sec   2.61 sec (x0.9)
+    300 m
+    classes         -        29.21 sec  36.25 sec (x0.8)
+    daymaps         -        28.90 sec  33.69 sec (x0.9)
+The worker processes do not pay off, polygonize traces in process by default.
+
+Run from the folder above the plugin folder:
+    python -m BAWS.test.benchmark_polygonize
+"""
+import time
+import numpy as np
+from rasterio.features import shapes
+from shapely.geometry import shape
+
+from BAWS.handlers.grid import get_grid
+from BAWS.handlers.polygonize import polygonize
+
+
+def dense_cloudy_day(shape=(1400, 1400), seed=1):
+    """Return class array with large cloud areas and speckle."""
+    rng = np.random.default_rng(seed)
+    blocks = (-(-shape[0] // 10), -(-shape[1] // 10))
+    array = rng.choice(5, size=blocks, p=[0.25, 0.45, 0.1, 0.05, 0.15])
+    array = array.repeat(10, axis=0).repeat(10, axis=1)[:shape[0], :shape[1]]
+    speckle = rng.choice(5, size=array.shape,
+                         p=[0.9, 0.05, 0.025, 0.015, 0.01])
+    return np.where(speckle > 0, speckle, array).astype(np.uint8)
+
+
+def feature_loop(array, grid, daymaps=False):
+    """Polygonization as it was done before (shapes() over the full grid)."""
+    features = []
+    if daymaps:
+        for s, v in shapes(array, transform=grid.transform):
+            if v in (2, 3):
+                features.append({'properties': {'class': int(v)},
+                                 'geometry': s})
+        for s, v in shapes(array, transform=grid.transform):
+            if v in (1, 4):
+                features.append({'properties': {'class': int(v)},
+                                 'geometry': s})
+    else:
+        for s, v in shapes(array, transform=grid.transform):
+            if v == 0:
+                continue
+            features.append({'properties': {'class': int(v)},
+                             'geometry': s})
+    # The features were turned into shapely objects for the area filters.
+    return [shape(f['geometry']) for f in features]
+
+
+def class_groups(array, grid, daymaps=False, parallel=False):
+    """Polygonization with handlers.polygonize."""
+    if daymaps:
+        return polygonize(array, grid=grid, groups=[(2, 3), (1, 4)],
+                          parallel=parallel)
+    return polygonize(array, grid=grid, parallel=parallel)
+
+
+def timeit(func, *args, **kwargs):
+    """Return time and result of func."""
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start_time, result
+
+
+if __name__ == '__main__':
+    for resolution in (1000, 300):
+        grid = get_grid(resolution)
+        array = dense_cloudy_day(grid.shape)
+        print('%i m %s' % (resolution, array.shape))
+        for daymaps in (False, True):
+            t_groups, res = timeit(class_groups, array, grid, daymaps=daymaps)
+            print('    daymaps=%s, %i polygons: class groups %.2f sec'
+                  % (daymaps, len(res), t_groups))
+            if resolution == 1000:
+                t_loop, ref = timeit(feature_loop, array, grid,
+                                     daymaps=daymaps)
+                assert len(ref) == len(res), 'Number of polygons differ!'
+                assert abs(sum(p.area for p in ref) - res.area.sum()) < 1, \
+                    'Polygon areas differ!'
+                print('        feature loop %.2f sec (x%.1f)'
+                      % (t_loop, t_loop / t_groups))
+            # The first call starts the worker processes.
+            class_groups(array, grid, daymaps=daymaps, parallel=True)
+            t_parallel, par = timeit(class_groups, array, grid,
+                                     daymaps=daymaps, parallel=True)
+            assert len(par) == len(res), 'Number of polygons differ!'
+            print('        class groups in worker processes %.2f sec (x%.1f)'
+                  % (t_parallel, t_groups / t_parallel))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-19 01:20
+
+@author: a002028
+
+Benchmark of the raster read cache (handlers.raster_cache) against reading
+and decompressing the GeoTIFF with rasterio on every read, for a daymap
+written as in production (handlers.raster_profile): the memory mapped disk
+cache alone (mmap) and with the session cache of arrays (session).
+
+Run from the folder above the plugin folder:
+    python -m BAWS.test.benchmark_raster_cache
+"""
+import os
+import time
+import tempfile
+import rasterio
+
+from BAWS.handlers import raster_cache
+from BAWS.handlers.grid import get_grid
+from BAWS.handlers.raster_profile import PRODUCT_COMPRESSION, write_raster
+from BAWS.test.benchmark_raster_profile import class_day
+
+
+def read_rasterio(path):
+    """Read the band as it was done before."""
+    with rasterio.open(path) as rst:
+        return rst.read(1)
+
+
+def read_mmap(path):
+    """Read the band from the disk cache and touch all pixels."""
+    raster_cache.clear()
+    return read_session(path)
+
+
+def read_session(path):
+    """Read the band through the raster cache and touch all pixels."""
+    array = raster_cache.read_band(path)
+    # A memory map is lazy, sum the array so the data is actually read.
+    array.sum()
+    return array
+
+
+def timeit(func, *args, repeat=5):
+    """Return first and best time of repeat calls of func."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start_time)
+    return times[0], min(times[1:])
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        raster_cache.configure(os.path.join(folder, 'cache'))
+        print('%-20s %-8s %8s %8s' % ('grid', 'read', 'first', 'repeat'))
+        for resolution in (1000, 300):
+            grid = get_grid(resolution)
+            array = class_day(grid.shape)
+            path = write_raster(
+                os.path.join(folder, 'daymap_%i.tiff' % resolution), array,
+                grid.profile(), compression=PRODUCT_COMPRESSION['daymap'])
+            assert (read_session(path) == array).all(), 'Data differ!'
+            raster_cache.invalidate(path)
+            for name, func in (('rasterio', read_rasterio),
+                               ('mmap', read_mmap),
+                               ('session', read_session)):
+                print('%-20s %-8s %8.4f %8.4f' % (
+                    '%i m %s' % (resolution, array.shape), name,
+                    *timeit(func, path)))
+        print(raster_cache.cache_info())
+        raster_cache.configure(None)
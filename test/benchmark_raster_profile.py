@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-19 00:30
+
+@author: a002028
+
+Benchmark of the raster output profiles (handlers.raster_profile) against
+the plain striped LZW GeoTIFF previously written from the raster template:
+write time, file size and read time for the whole raster, for windows (as
+QGIS reads when zoomed in) and for a zoomed out view (decimated read, served
+from the overviews).
+
+Used to pick PRODUCT_COMPRESSION. Run from the folder above the plugin
+folder:
+    python -m BAWS.test.benchmark_raster_profile
+"""
+import os
+import time
+import tempfile
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from BAWS.handlers.grid import get_grid
+from BAWS.handlers.raster_profile import COMPRESSIONS, write_raster
+
+
+def class_day(shape, seed=1):
+    """Return class array (0-4) with large cloud and bloom areas."""
+    rng = np.random.default_rng(seed)
+    small = (shape[0] // 10 + 1, shape[1] // 10 + 1)
+    array = rng.choice(5, size=small, p=[0.4, 0.35, 0.1, 0.05, 0.1])
+    array = array.repeat(10, axis=0).repeat(10, axis=1)[:shape[0], :shape[1]]
+    speckle = rng.choice(5, size=shape, p=[0.95, 0.02, 0.015, 0.01, 0.005])
+    return np.where(speckle > 0, speckle, array).astype(np.uint8)
+
+
+def week_count(shape, seed=1):
+    """Return weekmap count array (0-7)."""
+    rng = np.random.default_rng(seed)
+    small = (shape[0] // 20 + 1, shape[1] // 20 + 1)
+    array = rng.choice(8, size=small,
+                       p=[0.6, 0.1, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03])
+    return array.repeat(20, axis=0).repeat(20, axis=1)[
+        :shape[0], :shape[1]].astype(np.uint8)
+
+
+def write_plain(path, array, meta):
+    """Write raster as it was done before (striped, LZW, no overviews)."""
+    profile = dict(meta, compress='lzw', count=1, dtype=array.dtype.name)
+    with rasterio.open(path, 'w', **profile) as out:
+        out.write(array, 1)
+    return path
+
+
+def read_full(path):
+    """Read the whole raster."""
+    with rasterio.open(path) as rst:
+        return rst.read(1)
+
+
+def read_windows(path, size=256, nr_windows=50, seed=1):
+    """Read random windows of size x size pixels."""
+    rng = np.random.default_rng(seed)
+    with rasterio.open(path) as rst:
+        for _ in range(nr_windows):
+            row = rng.integers(0, rst.height - size)
+            col = rng.integers(0, rst.width - size)
+            rst.read(1, window=Window(col, row, size, size))
+
+
+def read_zoomed_out(path, factor=4):
+    """Read the whole raster decimated by factor (zoomed out map)."""
+    with rasterio.open(path) as rst:
+        return rst.read(1, out_shape=(rst.height // factor,
+                                      rst.width // factor))
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Return best time of repeat calls of func."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def benchmark(name, array, meta, folder):
+    """Print write / size / read numbers of array for all profiles."""
+    print('\n%s %s' % (name, array.shape))
+    print('%-10s %8s %9s %8s %8s %8s' % ('profile', 'write', 'size (kB)',
+                                          'full', 'windows', 'zoomed'))
+    writers = {'plain lzw': lambda p: write_plain(p, array, meta)}
+    for compression in COMPRESSIONS:
+        writers[compression] = (
+            lambda p, c=compression: write_raster(p, array, meta,
+                                                  compression=c))
+    for profile, writer in writers.items():
+        path = os.path.join(folder, '%s_%s.tiff'
+                            % (name, profile.replace(' ', '_')))
+        t_write = timeit(writer, path)
+        assert (read_full(path) == array).all(), 'Data differ!'
+        print('%-10s %8.3f %9.0f %8.3f %8.3f %8.3f' % (
+            profile, t_write, os.path.getsize(path) / 1024,
+            timeit(read_full, path), timeit(read_windows, path),
+            timeit(read_zoomed_out, path)))
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        for resolution in (1000, 300):
+            grid = get_grid(resolution)
+            meta = grid.profile()
+            benchmark('daymap_%i' % resolution, class_day(grid.shape),
+                      meta, folder)
+            benchmark('weekmap_%i' % resolution, week_count(grid.shape),
+                      meta, folder)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-18 23:40
+
+@author: a002028
+
+Benchmark of the bulk reprojection to the map projection
+(handlers.reproject) against the EPSG:4326 detour with one
+shapely.ops.transform(map_obj, polygon) per polygon, previously used in
+BaseShapeHandler.change_csr / get_matplotlib_patches, on a weekmap with
+thousands of polygons.
+
+Run from the folder above the plugin folder:
+    python -m BAWS.test.benchmark_reproject
+"""
+import time
+import numpy as np
+import shapely
+import shapely.ops
+from mpl_toolkits.basemap import Basemap
+
+from BAWS.handlers.grid import get_grid
+from BAWS.handlers.polygonize import polygonize
+from BAWS.handlers.reproject import MapProjection
+
+
+def get_map_obj():
+    """Return Basemap with the settings of the BAWS maps (no coastlines)."""
+    return Basemap(
+        resolution=None, projection='laea', ellps='bessel',
+        width=1400000, height=1400000,
+        lon_0=14., lat_1=60., lat_2=60., lat_0=60,
+        llcrnrlon=6.8118748038970524,
+        llcrnrlat=53.336819380313962,
+        urcrnrlon=33.813214510263896,
+        urcrnrlat=64.892858589601166,
+    )
+
+
+def weekmap_shapes(seed=1):
+    """Return GeoDataFrame of a patchy 1000 m weekmap (values 0-7)."""
+    rng = np.random.default_rng(seed)
+    array = rng.choice(8, size=(280, 280),
+                       p=[0.6, 0.1, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03])
+    array = array.repeat(5, axis=0).repeat(5, axis=1).astype(np.uint8)
+    return polygonize(array, grid=get_grid(1000))
+
+
+def detour(shapes, map_obj):
+    """Reprojection as it was done before (EPSG:4326, polygon by polygon)."""
+    geometries = shapes['geometry'].to_crs(epsg=4326)
+    return [shapely.ops.transform(map_obj, poly) for poly in geometries]
+
+
+def bulk(shapes, map_obj):
+    """Reprojection with handlers.reproject."""
+    projection = MapProjection(map_obj, crs=shapes.crs.to_string())
+    return projection.transform(shapes['geometry'].values)
+
+
+def timeit(func, *args, **kwargs):
+    """Return time and result of func."""
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start_time, result
+
+
+if __name__ == '__main__':
+    map_obj = get_map_obj()
+    shapes = weekmap_shapes()
+    t_detour, ref = timeit(detour, shapes, map_obj)
+    t_bulk, res = timeit(bulk, shapes, map_obj)
+    diff = np.abs(shapely.get_coordinates(np.array(ref, dtype=object))
+                  - shapely.get_coordinates(res)).max()
+    assert diff < 1, 'Coordinates differ by %.3f m!' % diff
+    print('%i polygons: EPSG:4326 detour %.2f sec, bulk %.3f sec (x%.0f), '
+          'max difference %.4f m'
+          % (len(res), t_detour, t_bulk, t_detour / t_bulk, diff))
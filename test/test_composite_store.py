@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 2026-10-19 10:30
+
+@author: a002028
+
+Tests of the rolling bloom count of handlers.composite.CompositeStore: the
+count after window moves and re-saved days must equal a full recount of the
+daily rasters in the window.
+
+Run from the folder above the plugin folder:
+    python -m unittest BAWS.test.test_composite_store
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from BAWS.handlers.composite import CompositeStore, bloom_mask
+from BAWS.handlers.raster_profile import write_raster
+
+
+SHAPE = (64, 80)
+META = {'crs': 'EPSG:3006', 'transform': from_origin(0, 6400000, 1000, 1000),
+        'dtype': 'uint8'}
+
+
+class TestCompositeStore(unittest.TestCase):
+    """Rolling bloom count against a full recount."""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.rng = np.random.default_rng(1)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_day(self, date):
+        """Write a random class raster of date and return its path."""
+        path = os.path.join(self.folder, 'cyano_daymap_%s.tiff' % date)
+        array = self.rng.integers(0, 5, size=SHAPE, dtype=np.uint8)
+        write_raster(path, array, META, overviews=False)
+        return path
+
+    @staticmethod
+    def recount(paths):
+        """Return the bloom count of the rasters, read from scratch."""
+        count = np.zeros(SHAPE, dtype=np.uint8)
+        for path in paths:
+            with rasterio.open(path) as rst:
+                count += bloom_mask(rst.read(1)).astype(np.uint8)
+        return count
+
+    def test_window_shift(self):
+        """Moving the window replaces only the day that fell out."""
+        paths = [self.write_day('202607%02i' % day) for day in range(1, 10)]
+        store = CompositeStore()
+        for i in range(len(paths) - 6):
+            window = paths[i:i + 7]
+            np.testing.assert_array_equal(store.update(window),
+                                          self.recount(window))
+        # Every file is read once.
+        self.assertEqual(store.nr_reads, len(paths))
+
+    def test_resaved_day(self):
+        """A re-saved day replaces its own contribution only."""
+        paths = [self.write_day('202607%02i' % day) for day in range(1, 8)]
+        store = CompositeStore()
+        store.update(paths)
+
+        self.write_day('20260704')
+        # Make sure the file key changes also on coarse file systems.
+        stat = os.stat(paths[3])
+        os.utime(paths[3], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        np.testing.assert_array_equal(store.update(paths),
+                                      self.recount(paths))
+        self.assertEqual(store.nr_reads, 8)
+
+    def test_resaved_day_and_shift(self):
+        """Re-saved day and window shift in the same update."""
+        paths = [self.write_day('202607%02i' % day) for day in range(1, 9)]
+        store = CompositeStore()
+        store.update(paths[:7])
+
+        self.write_day('20260705')
+        stat = os.stat(paths[4])
+        os.utime(paths[4], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        window = paths[1:8]
+        np.testing.assert_array_equal(store.update(window),
+                                      self.recount(window))
+
+    def test_shrinking_window(self):
+        """Days that are missing from the window are subtracted."""
+        paths = [self.write_day('202607%02i' % day) for day in range(1, 8)]
+        store = CompositeStore()
+        store.update(paths)
+        window = paths[:3] + paths[5:]
+        np.testing.assert_array_equal(store.update(window),
+                                      self.recount(window))
+
+
+if __name__ == '__main__':
+    unittest.main()
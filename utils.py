@@ -5,10 +5,8 @@ Created on 2019-05-20 16:42
 @author: a002028
 """
 import os
-import time
 from decimal import Decimal, ROUND_HALF_UP
-from collections import Mapping
-from threading import Thread
+from collections.abc import Mapping
 
 
 def valid_baws_area():
@@ -27,26 +25,6 @@ def valid_baws_area():
     }
 
 
-def sleep_while_saving(file_paths):
-    """Sleep while a file is under modification.
-
-    Args:
-        file_paths: Iterable of file paths.
-    """
-    changes = {path: os.path.getmtime(path) for path in file_paths}
-    change = True
-    while change:
-        change = False
-        for f in file_paths:
-            if changes.get(f) != os.path.getmtime(f):
-                # fix_print_with_import
-                print("File {} has been modified".format(f))
-                changes[f] = os.path.getmtime(f)
-                change = True
-        if change:
-            time.sleep(0.1)
-
-
 def get_file_sizes(files):
     """Return dictionary with file sizes.
 
@@ -94,17 +72,6 @@ def recursive_dict_update(d, u):
     return d
 
 
-def thread_process(call_function, *args, **kwargs):
-    """Thread a given function.
-
-    Args:
-        call_function: Function to start.
-        *args: Arguments to pass to function.
-        **kwargs: Keyword arguments to pass to function.
-    """
-    Thread(target=call_function, args=args, kwargs=kwargs).start()
-
-
 def generate_filepaths(directory, pattern='', not_pattern='DUMMY_PATTERN',
                        pattern_list=None, endswith='', only_from_dir=True):
     """"""
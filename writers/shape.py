@@ -4,7 +4,11 @@ Created on 2019-05-16 15:09
 
 @author: a002028
 """
-from qgis.core import QgsVectorFileWriter
+try:
+    from qgis.core import QgsVectorFileWriter
+except ImportError:
+    # Headless use (see batch.py), only the geopandas writer works.
+    QgsVectorFileWriter = None
 
 
 class GeoPandasShapeWriterBase:
@@ -33,7 +37,10 @@ class QGISShapeWriterBase:
 
         *args should equal (layer, output_path, "utf-8", None, "ESRI Shapefile")
         """
-        QgsVectorFileWriter.writeAsVectorFormat(*args, **kwargs)
+        result = QgsVectorFileWriter.writeAsVectorFormat(*args, **kwargs)
+        error = result[0] if isinstance(result, tuple) else result
+        if error != QgsVectorFileWriter.NoError:
+            raise IOError('Could not write shapefile: %s' % (result, ))
 
 
 class NoneWriterBase: